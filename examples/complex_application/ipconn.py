@@ -5,12 +5,13 @@ from lxml.etree import Element, _Element
 from lxml.objectify import ObjectifiedElement
 
 # internal modules for custom impl
-from xmlable._lxml_helpers import with_child, with_text, XMLSchema, XMLURL
+from xmlable._lxml_helpers import with_child, with_text, XMLSchema
 from xmlable._errors import XError, XErrorCtx
 from xmlable._xobject import XObject
 from xmlable._user import IXmlify
 from xmlable._manual import manual_xmlify
-from xmlable._utils import firstkey, AnyType
+from xmlable._utils import AnyType
+from xmlable._schema import xs_qualified
 
 import re
 
@@ -34,8 +35,8 @@ class IPv4Conn(IXmlify):
             def xsd_out(
                 self,
                 name: str,
-                attribs: dict[str, str] = {},
-                add_ns: dict[str, str] = {},
+                attribs: dict[str, str] | None = None,
+                add_ns: dict[str, str] | None = None,
             ) -> _Element:
                 return Element(
                     f"{XMLSchema}element",
@@ -83,22 +84,9 @@ class IPv4Conn(IXmlify):
 
     @staticmethod
     def xsd_forward(add_ns: dict[str, str]) -> _Element:
-        # check if the XML namespace has been additionally declared
-        # if so we should use this prefix for type
-        if (prefix := firstkey(add_ns, XMLURL)) is not None:
-            restrict = Element(
-                f"{XMLSchema}restriction",
-                base=f"{prefix}:string",
-            )
-        else:
-            new_ns = "xs"
-            while new_ns in add_ns:
-                new_ns += "s"
-            restrict = Element(
-                f"{XMLSchema}restriction",
-                base=f"{new_ns}:string",
-                nsmap={new_ns: XMLURL},
-            )
+        # the XMLSchema prefix is declared on the schema, or on this element
+        base, nsmap = xs_qualified("string", add_ns)
+        restrict = Element(f"{XMLSchema}restriction", base=base, nsmap=nsmap)
 
         return with_child(
             Element(f"{XMLSchema}simpleType", name="IPv4Conn"),
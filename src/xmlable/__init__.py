@@ -1,9 +1,19 @@
-from xmlable._xmlify import xmlify
+from xmlable._xmlify import xmlify, UNPARSED
 from xmlable._io import (
     parse_file,
+    validate_file,
     write_xml_value,
+    write_xml_values,
     write_xml_template,
     write_xsd,
+    write_xsd_modules,
+    canonical_xml,
+    ConfigCache,
+    IncrementalParser,
 )
+from xmlable._query import query_file
+from xmlable._parallel import parse_file_parallel
+from xmlable._threads import run_concurrently
+from xmlable._options import using_options
 
 __version__ = "2.0.7"
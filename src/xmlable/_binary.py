@@ -0,0 +1,96 @@
+"""
+A compact binary encoding
+- Values are encoded by walking the same xobjects used for xml, so the same
+  types give an xml and a binary representation
+- Lengths and integers are varints, floats are 8 bytes, strings and nested
+  xml are length prefixed
+"""
+
+from struct import Struct
+from typing import Any, Callable, TypeAlias
+
+# NOTE: Binary headers contain the fingerprint of the class encoded (see
+#       xml_fingerprint), so decoding with a different class is detected
+MAGIC = b"XB"
+FINGERPRINT_BYTES = 8
+
+DOUBLE = Struct("<d")
+
+
+def write_uvarint(out: bytearray, n: int):
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def read_uvarint(buf: memoryview, pos: int) -> tuple[int, int]:
+    n = 0
+    shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        n |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+def write_int(out: bytearray, n: int):
+    # zigzag, so small negative numbers are small
+    write_uvarint(out, n * 2 if n >= 0 else -n * 2 - 1)
+
+
+def read_int(buf: memoryview, pos: int) -> tuple[int, int]:
+    z, pos = read_uvarint(buf, pos)
+    return (z >> 1) if z & 1 == 0 else -((z + 1) >> 1), pos
+
+
+def write_bytes(out: bytearray, data: bytes):
+    write_uvarint(out, len(data))
+    out += data
+
+
+def read_bytes(buf: memoryview, pos: int) -> tuple[bytes, int]:
+    n, pos = read_uvarint(buf, pos)
+    end = pos + n
+    if end > len(buf):
+        raise IndexError(f"{n} bytes at {pos} is beyond the end of the buffer")
+    return bytes(buf[pos:end]), end
+
+
+def write_float(out: bytearray, f: float):
+    out += DOUBLE.pack(f)
+
+
+def read_float(buf: memoryview, pos: int) -> tuple[float, int]:
+    return DOUBLE.unpack_from(buf, pos)[0], pos + DOUBLE.size
+
+
+def write_str(out: bytearray, s: str):
+    write_bytes(out, s.encode())
+
+
+def read_str(buf: memoryview, pos: int) -> tuple[str, int]:
+    data, pos = read_bytes(buf, pos)
+    return data.decode(), pos
+
+
+def write_bool(out: bytearray, b: bool):
+    out.append(1 if b else 0)
+
+
+def read_bool(buf: memoryview, pos: int) -> tuple[bool, int]:
+    return buf[pos] != 0, pos + 1
+
+
+Writer: TypeAlias = Callable[[bytearray, Any], None]
+Reader: TypeAlias = Callable[[memoryview, int], tuple[Any, int]]
+
+# codecs for basic types, by their xsd type
+BASIC_CODECS: dict[str, tuple[Writer, Reader]] = {
+    "integer": (write_int, read_int),
+    "decimal": (write_float, read_float),
+    "string": (write_str, read_str),
+    "boolean": (write_bool, read_bool),
+}
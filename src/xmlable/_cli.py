@@ -0,0 +1,330 @@
+"""
+The command line tool (`python -m xmlable`)
+- Classes are imported by dotted path (e.g. `myapp.config.Config` or
+  `myapp.config:Config`)
+- Files are processed by worker processes (-j), each importing the class once,
+  so interpreter startup is paid per worker rather than per file
+- Reports the time taken for each file, and the total throughput
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser, Namespace
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import cache, partial
+from importlib import import_module
+from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator
+from termcolor import colored
+
+from xmlable._utils import typename
+from xmlable._errors import XError, ErrorTypes
+from xmlable._xobject import is_xmlified
+from xmlable._io import parse_file, validate_file, write_tree
+from xmlable._compression import open_xml, codec_for
+
+
+@cache
+def load_class(cls_path: str) -> type:
+    """Import a class by its dotted path (module.Class or module:Class)"""
+    if ":" in cls_path:
+        module_name, _, name = cls_path.partition(":")
+    else:
+        module_name, _, name = cls_path.rpartition(".")
+    obj: object = import_module(module_name)
+    for attr in name.split("."):
+        obj = getattr(obj, attr)
+    if not isinstance(obj, type):
+        raise TypeError(f"{cls_path} is not a class")
+    elif not is_xmlified(obj):
+        raise ErrorTypes.NotXmlified(obj)
+    return obj
+
+
+@dataclass
+class Outcome:
+    """The result of processing one file (errors are rendered as text)"""
+
+    name: str
+    seconds: float
+    size: int
+    errors: list[str] = field(default_factory=list)
+
+
+def render(e: Exception, color: bool) -> str:
+    return (
+        e.format(color)
+        if isinstance(e, XError)
+        else f"{typename(type(e))}: {e}"
+    )
+
+
+def timed(name: str, color: bool, job: Callable[[], list[XError]]) -> Outcome:
+    start = time.perf_counter()
+    try:
+        errors: list[Exception] = list(job())
+    except Exception as e:
+        # JUSTIFY: Any failure (e.g. malformed xml) is reported for this file,
+        #          and the remaining files are still processed
+        errors = [e]
+    seconds = time.perf_counter() - start
+    size = os.path.getsize(name) if os.path.isfile(name) else 0
+    return Outcome(name, seconds, size, [render(e, color) for e in errors])
+
+
+def write_replacing(dest: Path, write: Callable[[IO[bytes]], None]):
+    """
+    Write a (possibly compressed) file through a temporary file in the same
+    directory, replacing dest only once complete (so a failure never leaves
+    dest, which can be the file being formatted, partially written)
+    - dest keeps its permissions, a new file gets the default (by umask)
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(
+        prefix=f".{dest.name}.", suffix=".tmp", dir=dest.parent
+    )
+    os.close(fd)
+    tmp = Path(tmp_name)
+    try:
+        with open_xml(tmp, "wb", codec_for(dest, "infer")) as f:
+            write(f)
+        if dest.exists():
+            shutil.copymode(dest, tmp)
+        else:
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp, 0o666 & ~umask)
+        os.replace(tmp, dest)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def validate_job(cls_path: str, color: bool, paths: tuple[str, str]) -> Outcome:
+    src, _ = paths
+    return timed(src, color, lambda: validate_file(load_class(cls_path), src))
+
+
+def format_job(
+    cls_path: str,
+    color: bool,
+    canonical: bool,
+    pretty: bool,
+    comments: bool,
+    sparse: bool,
+    paths: tuple[str, str],
+) -> Outcome:
+    src, dest = paths
+
+    def job() -> list[XError]:
+        val = parse_file(load_class(cls_path), src)
+        tree = val.xml_value(
+            canonical=canonical, comments=comments, sparse=sparse
+        )
+        write_replacing(
+            Path(dest), lambda f: write_tree(f, tree, canonical, pretty)
+        )
+        return []
+
+    return timed(src, color, job)
+
+
+def generate_job(
+    kind: str,
+    out_dir: str,
+    pretty: bool,
+    comments: bool,
+    color: bool,
+    cls_path: str,
+) -> Outcome:
+    def job() -> list[XError]:
+        cls = load_class(cls_path)
+        name = typename(cls)
+        if kind == "xsd":
+            tree, dest = cls.xsd(comments=comments), f"{name}.xsd"  # type: ignore[attr-defined]
+        else:
+            tree, dest = cls.xml(), f"{name}_template.xml"  # type: ignore[attr-defined]
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+        with open_xml(Path(out_dir) / dest, "wb") as f:
+            write_tree(f, tree, pretty=pretty)
+        return []
+
+    return timed(cls_path, color, job)
+
+
+def find_files(
+    paths: Iterable[str], pattern: str, out_dir: str | None
+) -> list[tuple[str, str]]:
+    """
+    The files to process (searching directories recursively for pattern),
+    each with its destination (in place, or at the same relative path in
+    out_dir)
+    """
+    found = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files = [
+                (f, f.relative_to(path)) for f in sorted(path.rglob(pattern))
+            ]
+        else:
+            files = [(path, Path(path.name))]
+        for f, rel in files:
+            if f.is_file():
+                dest = f if out_dir is None else Path(out_dir) / rel
+                found.append((str(f), str(dest)))
+    return found
+
+
+def run_jobs(
+    job: Callable[[str], Outcome] | Callable[[tuple[str, str]], Outcome],
+    items: list,
+    workers: int,
+) -> Iterator[Outcome]:
+    """Run the jobs in order, in worker processes if workers > 1"""
+    if workers <= 1 or len(items) <= 1:
+        yield from map(job, items)
+    else:
+        # JUSTIFY: Jobs are sent in chunks so the cost of sending each job to
+        #          a worker is amortised over many (small) files
+        chunksize = max(1, len(items) // (workers * 4))
+        with ProcessPoolExecutor(workers) as pool:
+            yield from pool.map(job, items, chunksize=chunksize)
+
+
+def report(outcomes: Iterable[Outcome], quiet: bool) -> int:
+    """Print each outcome and the totals, returning the number failed"""
+    start = time.perf_counter()
+    count = failed = size = 0
+    for outcome in outcomes:
+        count += 1
+        size += outcome.size
+        ok = not outcome.errors
+        failed += not ok
+        if not quiet or not ok:
+            status = colored("ok  ", "green") if ok else colored("FAIL", "red")
+            print(f"{status} {outcome.seconds * 1000:9.1f}ms  {outcome.name}")
+        for error in outcome.errors:
+            print("  " + error.replace("\n", "\n  "))
+    seconds = max(time.perf_counter() - start, 1e-9)
+    mb = size / 1_000_000
+    print(
+        f"{count} processed ({mb:.1f}MB) in {seconds:.2f}s, "
+        f"{count / seconds:.1f}/s ({mb / seconds:.1f}MB/s), {failed} failed"
+    )
+    return failed
+
+
+def arguments() -> ArgumentParser:
+    parser = ArgumentParser(
+        prog="xmlable",
+        description="Validate, format and generate xml for xmlified classes",
+    )
+    common = ArgumentParser(add_help=False)
+    common.add_argument(
+        "-j", "--jobs", type=int, default=1, help="worker processes to use"
+    )
+    common.add_argument(
+        "-q", "--quiet", action="store_true", help="only report failures"
+    )
+    common.add_argument(
+        "--no-color", action="store_true", help="plain text errors"
+    )
+    files = ArgumentParser(add_help=False)
+    files.add_argument("cls", help="the class (module.Class or module:Class)")
+    files.add_argument("paths", nargs="+", help="files and directories")
+    files.add_argument(
+        "--pattern",
+        default="*.xml*",
+        help="the files to process in directories (default: *.xml*)",
+    )
+
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser(
+        "validate", parents=[common, files], help="check files parse"
+    )
+    fmt = commands.add_parser(
+        "format", parents=[common, files], help="parse and rewrite files"
+    )
+    fmt.add_argument(
+        "-o", "--out", help="directory to write to (default: in place)"
+    )
+    fmt.add_argument(
+        "--canonical", action="store_true", help="write canonical xml"
+    )
+    fmt.add_argument(
+        "--compact", action="store_true", help="write without indentation"
+    )
+    fmt.add_argument("--no-comments", action="store_true", help="omit comments")
+    fmt.add_argument(
+        "--sparse", action="store_true", help="omit members with defaults"
+    )
+    for kind, help in [
+        ("xsd", "write schemas"),
+        ("template", "write templates"),
+    ]:
+        gen = commands.add_parser(kind, parents=[common], help=help)
+        gen.add_argument("classes", nargs="+", help="the classes")
+        gen.add_argument(
+            "-o", "--out", default=".", help="directory to write to"
+        )
+        gen.add_argument(
+            "--compact", action="store_true", help="write without indentation"
+        )
+        if kind == "xsd":
+            gen.add_argument(
+                "--no-comments", action="store_true", help="omit comments"
+            )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args: Namespace = arguments().parse_args(argv)
+    color = not args.no_color
+
+    # classes are imported from the working directory (as with python -m)
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+
+    job: Callable
+    if args.command in ("xsd", "template"):
+        items = args.classes
+        job = partial(
+            generate_job,
+            args.command,
+            args.out,
+            not args.compact,
+            not getattr(args, "no_comments", False),
+            color,
+        )
+    else:
+        try:
+            load_class(args.cls)
+        except (
+            ImportError,
+            AttributeError,
+            ValueError,
+            TypeError,
+            XError,
+        ) as e:
+            print(f"Could not load {args.cls}: {e}", file=sys.stderr)
+            return 2
+        if args.command == "validate":
+            items = find_files(args.paths, args.pattern, None)
+            job = partial(validate_job, args.cls, color)
+        else:
+            items = find_files(args.paths, args.pattern, args.out)
+            job = partial(
+                format_job,
+                args.cls,
+                color,
+                args.canonical,
+                not args.compact,
+                not args.no_comments,
+                args.sparse,
+            )
+
+    return 1 if report(run_jobs(job, items, args.jobs), args.quiet) else 0
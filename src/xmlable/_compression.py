@@ -0,0 +1,87 @@
+"""
+Compressed files
+- Files are compressed by the codec for their extension, or an explicit one
+- Only codecs from the standard library are used (zstd from python 3.14)
+"""
+
+import bz2
+import gzip
+import lzma
+import zlib
+from pathlib import Path
+from typing import IO, Callable, Literal, cast
+
+from xmlable._errors import ErrorTypes
+
+Opener = Callable[[Path, Literal["rb", "wb"]], IO[bytes]]
+
+
+def open_gzip(file_path: Path, mode: Literal["rb", "wb"]) -> IO[bytes]:
+    # NOTE: gzip's default level (9) is much slower to write for a few percent
+    #       smaller files
+    return cast(IO[bytes], gzip.open(file_path, mode, compresslevel=6))
+
+
+def open_xz(file_path: Path, mode: Literal["rb", "wb"]) -> IO[bytes]:
+    return cast(IO[bytes], lzma.open(file_path, mode))
+
+
+def open_bz2(file_path: Path, mode: Literal["rb", "wb"]) -> IO[bytes]:
+    return cast(IO[bytes], bz2.open(file_path, mode))
+
+
+CODECS: dict[str, Opener] = {"gzip": open_gzip, "xz": open_xz, "bz2": open_bz2}
+
+# The errors reading a missing, truncated or corrupt (compressed) file
+# NOTE: bz2 and gzip's header checks raise OSError, their data errors are
+#       zlib.error for gzip, and lzma.LZMAError for xz
+READ_ERRORS: tuple[type[Exception], ...] = (
+    OSError,
+    EOFError,
+    lzma.LZMAError,
+    zlib.error,
+)
+
+try:
+    from compression import zstd  # type: ignore[import-not-found]
+
+    def open_zstd(file_path: Path, mode: Literal["rb", "wb"]) -> IO[bytes]:
+        return cast(IO[bytes], zstd.open(file_path, mode))
+
+    CODECS["zstd"] = open_zstd
+    READ_ERRORS += (zstd.ZstdError,)
+except ImportError:
+    pass
+
+EXTENSIONS: dict[str, str] = {
+    ".gz": "gzip",
+    ".xz": "xz",
+    ".lzma": "xz",
+    ".bz2": "bz2",
+    ".zst": "zstd",
+}
+
+# "infer" from the file's extension, None to not compress
+Compression = str | None
+
+
+def codec_for(file_path: str | Path, compression: Compression) -> str | None:
+    if compression == "infer":
+        return EXTENSIONS.get(Path(file_path).suffix.lower())
+    else:
+        return compression
+
+
+def open_xml(
+    file_path: str | Path,
+    mode: Literal["rb", "wb"],
+    compression: Compression = "infer",
+) -> IO[bytes]:
+    """Open a (possibly compressed) file, reading/writing uncompressed bytes"""
+    codec = codec_for(file_path, compression)
+    if codec is None:
+        return open(file=file_path, mode=mode)
+    elif (opener := CODECS.get(codec)) is not None:
+        return opener(Path(file_path), mode)
+    else:
+        raise ErrorTypes.UnknownCompression(codec, list(CODECS.keys()))
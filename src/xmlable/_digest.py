@@ -0,0 +1,57 @@
+"""
+Digests of xml subtrees
+- Used to find which parts of a document have changed since it was last parsed
+- The values parsed from unchanged subtrees can be reused
+"""
+
+from dataclasses import dataclass, field
+from hashlib import blake2b
+from typing import Any
+from lxml.etree import iterwalk, _Element
+from lxml.objectify import ObjectifiedElement
+
+from xmlable._lxml_helpers import children
+
+
+@dataclass
+class XParsed:
+    """
+    A value parsed from an element, with the digest of the element and the
+    parsed children it was built from (to reuse when reparsing)
+    - tag records which variant a union was parsed as (children are only
+      reused for the same variant)
+    """
+
+    digest: bytes
+    val: Any
+    children: list["XParsed"] = field(default_factory=list)
+    tag: str | None = None
+
+
+class Digests:
+    """
+    The digests of every element in a tree
+    - Computed bottom up in a single pass, so each element is hashed once
+    - Comments are ignored
+    """
+
+    def __init__(self, root: ObjectifiedElement):
+        # NOTE: lxml elements are proxies created on access, so digests are
+        #       keyed by id, and the proxies kept alive to keep ids unique
+        self._elems: list[_Element] = []
+        self._digests: dict[int, bytes] = {}
+        for _, elem in iterwalk(root, events=("end",)):
+            if elem.tag == "comment" or not isinstance(elem.tag, str):
+                continue
+            h = blake2b(digest_size=16)
+            h.update(elem.tag.encode())
+            h.update(b"\0" + (elem.text or "").encode())
+            for k, v in sorted(elem.attrib.items()):
+                h.update(f"\0{k}={v}".encode())
+            for child in children(elem):  # type: ignore[arg-type]
+                h.update(self._digests[id(child)])
+            self._elems.append(elem)
+            self._digests[id(elem)] = h.digest()
+
+    def __getitem__(self, elem: ObjectifiedElement) -> bytes:
+        return self._digests[id(elem)]
@@ -4,48 +4,147 @@ Colourful & descriptive errors for xmlable
 - Trace for parsing
 """
 
-from dataclasses import dataclass
-from typing import Any, Iterable
+from typing import Any, Iterable, Sequence
 from termcolor import colored
 from termcolor.termcolor import Color
 
 from xmlable._utils import typename, AnyType
 
 
-def trace_note(trace: list[str], arrow_c: Color, node_c: Color):
-    return colored(" > ", arrow_c).join(
-        map(lambda x: colored(x, node_c), trace)
+def paint(text: str, color: Color, on: bool) -> str:
+    return colored(text, color) if on else text
+
+
+def trace_note(
+    trace: list[str], arrow_c: Color, node_c: Color, on: bool = True
+):
+    return paint(" > ", arrow_c, on).join(
+        map(lambda x: paint(x, node_c, on), trace)
     )
 
 
-@dataclass
 class XErrorCtx:
-    trace: list[str]
+    """
+    Where an error occured, as a trace of element names
+    - Linked to its parent, so next is cheap (parsing creates one for every
+      element), the trace is only built when needed
+    """
+
+    __slots__ = ("nodes", "parent")
+
+    def __init__(self, trace: Sequence[str], parent: "XErrorCtx | None" = None):
+        self.nodes = trace
+        self.parent = parent
+
+    def next(self, node: str) -> "XErrorCtx":
+        return XErrorCtx((node,), self)
 
-    def next(self, node: str):
-        return XErrorCtx(trace=self.trace + [node])
+    @property
+    def trace(self) -> list[str]:
+        parts: list[Sequence[str]] = []
+        ctx: XErrorCtx | None = self
+        while ctx is not None:
+            parts.append(ctx.nodes)
+            ctx = ctx.parent
+        return [node for nodes in reversed(parts) for node in nodes]
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, XErrorCtx) and self.trace == other.trace
+
+    def __repr__(self) -> str:
+        return f"XErrorCtx({self.trace!r})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (XErrorCtx, (self.trace,))
 
 
 # TODO: Custom backtrace to point to location in the file
 class XError(Exception):
+    """
+    An error with structured fields, rendered only when displayed
+    - what and why are format strings for values (if any), so values are not
+      converted to strings unless the error is shown
+    - format(color=False) gives plain text (e.g. for logs)
+    """
+
     def __init__(
         self,
         short: str,
         what: str,
         why: str,
         ctx: XErrorCtx | None = None,
-        notes: Iterable[str] = [],
+        notes: Iterable[str] = (),
+        values: dict[str, Any] | None = None,
     ):
-        super().__init__(colored(short, "red", attrs=["blink"]))
-        self.add_note(colored("What:  " + what, "blue"))
-        self.add_note(colored("Why:   " + why, "yellow"))
-        if ctx is not None:
-            self.add_note(
-                colored("Where: ", "magenta")
-                + trace_note(ctx.trace, "light_magenta", "light_cyan")
+        super().__init__(short)
+        self.short = short
+        self.what_fmt = what
+        self.why_fmt = why
+        self.ctx = ctx
+        self.notes = list(notes)
+        self.values = values
+        self._notes: list[str] | None = None
+
+    @property
+    def what(self) -> str:
+        if self.values is None:
+            return self.what_fmt
+        return self.what_fmt.format(**self.values)
+
+    @property
+    def why(self) -> str:
+        if self.values is None:
+            return self.why_fmt
+        return self.why_fmt.format(**self.values)
+
+    def note_lines(self, color: bool = True) -> list[str]:
+        lines = [
+            paint("What:  " + self.what, "blue", color),
+            paint("Why:   " + self.why, "yellow", color),
+        ]
+        if self.ctx is not None:
+            lines.append(
+                paint("Where: ", "magenta", color)
+                + trace_note(
+                    self.ctx.trace, "light_magenta", "light_cyan", color
+                )
             )
-        for note in notes:
-            self.add_note(note)
+        return lines + self.notes
+
+    def format(self, color: bool = False) -> str:
+        return "\n".join(
+            [paint(self.short, "red", color)] + self.note_lines(color)
+        )
+
+    def __str__(self) -> str:
+        return colored(self.short, "red", attrs=["blink"])
+
+    # JUSTIFY: Tracebacks display __notes__, so they are rendered when first
+    #          accessed rather than on construction (add_note still appends)
+    @property  # type: ignore[misc]
+    def __notes__(self) -> list[str]:
+        if self._notes is None:
+            self._notes = self.note_lines()
+        return self._notes
+
+    @__notes__.setter
+    def __notes__(self, notes: list[str]):
+        self._notes = notes
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # JUSTIFY: errors are rebuilt from their rendered fields (e.g. when
+        #          raised in a worker process), as values may not be picklable
+        return (XError, (self.short, self.what, self.why, self.ctx, self.notes))
+
+
+class UnionNames:
+    """The variants of a union, joined only when formatted"""
+
+    def __init__(self, types: list[AnyType]):
+        self.types = types
+
+    def __str__(self) -> str:
+        return " | ".join(map(str, self.types))
 
 
 class ErrorTypes:
@@ -57,13 +156,22 @@ class ErrorTypes:
             why=f"All types used in an xmlified class must be xmlified",
         )
 
+    @staticmethod
+    def InvalidTypecode(t_name: str, typecode: Any, supported: str) -> XError:
+        return XError(
+            short="Invalid Typecode",
+            what=f"{t_name} has typecode {typecode!r}, which is not a numeric typecode",
+            why=f"Arrays are written as numbers, so must have one of the typecodes {supported}",
+        )
+
     @staticmethod
     def InvalidData(ctx: XErrorCtx, val: Any, t_name: str) -> XError:
         return XError(
             short="Invalid Data",
-            what=f"Could not validate {val} as a valid {t_name}",
-            why=f"Produced xml must be valid",
+            what="Could not validate {val} as a valid {t_name}",
+            why="Produced xml must be valid",
             ctx=ctx,
+            values={"val": val, "t_name": t_name},
         )
 
     @staticmethod
@@ -72,9 +180,20 @@ class ErrorTypes:
     ) -> XError:
         return XError(
             short="Parse Failure",
-            what=f"Failed to parse {text} as a {t_name} with error: \n {caught}",
-            why=f"This error implies the xml is not validated against the current xsd, or there is a bug in this type's parser",
+            what="Failed to parse {text} as a {t_name} with error: \n {caught}",
+            why="This error implies the xml is not validated against the current xsd, or there is a bug in this type's parser",
+            ctx=ctx,
+            values={"text": text, "t_name": t_name, "caught": caught},
+        )
+
+    @staticmethod
+    def InvalidPlain(ctx: XErrorCtx, val: Any, t_name: str) -> XError:
+        return XError(
+            short="Invalid Plain Data",
+            what="Could not read {val!r} as a {t_name}",
+            why="Plain data must have the structure produced by to_plain",
             ctx=ctx,
+            values={"val": val, "t_name": t_name},
         )
 
     @staticmethod
@@ -94,9 +213,16 @@ class ErrorTypes:
     ) -> XError:
         return XError(
             short="Incorrect Type",
-            what=f"You have provided {len(val)} values {val} for {name}, but {name} is a {struct_name} that takes only {expected_len} values",
-            why=f"In order to generate xml, the values provided need to be the correct types",
+            what="You have provided {n} values {val} for {name}, but {name} is a {struct_name} that takes only {expected_len} values",
+            why="In order to generate xml, the values provided need to be the correct types",
             ctx=ctx,
+            values={
+                "n": len(val),
+                "val": val,
+                "name": name,
+                "struct_name": struct_name,
+                "expected_len": expected_len,
+            },
         )
 
     @staticmethod
@@ -121,9 +247,10 @@ class ErrorTypes:
     ) -> XError:
         return XError(
             short=f"Duplicate item in {struct_name}",
-            what=f"In {tag} the item {item} is present more than once",
-            why=f"A set can only contain unique items",
+            what="In {tag} the item {item} is present more than once",
+            why="A set can only contain unique items",
             ctx=ctx,
+            values={"tag": tag, "item": item},
         )
 
     @staticmethod
@@ -150,12 +277,17 @@ class ErrorTypes:
         found_type: AnyType | None,
         found_value: Any,
     ) -> XError:
-        types = " | ".join(map(str, expected_types))
         return XError(
             short=f"Datatype not in Union",
-            what=f"{name} is a union of {types}, which does not contain {found_type} (you provided: {found_value})",
-            why=f"... uuuh, its a union?",
+            what="{name} is a union of {types}, which does not contain {found_type} (you provided: {found_value})",
+            why="... uuuh, its a union?",
             ctx=ctx,
+            values={
+                "name": name,
+                "types": UnionNames(expected_types),
+                "found_type": found_type,
+                "found_value": found_value,
+            },
         )
 
     @staticmethod
@@ -178,13 +310,51 @@ class ErrorTypes:
             ctx=ctx,
         )
 
+    @staticmethod
+    def InvalidQueryStep(ctx: XErrorCtx, step: Any, struct_name: str) -> XError:
+        return XError(
+            short="Invalid Query Step",
+            what="Cannot select {step!r} from a {struct_name}",
+            why="Queries can select members by name, list and tuple items by index and dictionary values by key",
+            ctx=ctx,
+            values={"step": step, "struct_name": struct_name},
+        )
+
+    @staticmethod
+    def QueryNotFound(ctx: XErrorCtx, tag: str) -> XError:
+        return XError(
+            short="Query Not Found",
+            what=f"The element {tag} ended before the queried value was found",
+            why=f"The selected member, index or key must be present",
+            ctx=ctx,
+        )
+
+    @staticmethod
+    def BinaryMismatch(cls: AnyType) -> XError:
+        cls_name: str = typename(cls)
+        return XError(
+            short="Binary Mismatch",
+            what=f"The binary was not encoded from the current {cls_name}",
+            why=f"Binaries start with the fingerprint of the class encoded, so can only be decoded by a class with the same xml representation",
+        )
+
+    @staticmethod
+    def InvalidBinary(cls: AnyType, reason: str) -> XError:
+        cls_name: str = typename(cls)
+        return XError(
+            short="Invalid Binary",
+            what=f"Could not decode a {cls_name}: {reason}",
+            why=f"The binary is truncated or corrupt",
+        )
+
     @staticmethod
     def NoneIsSome(ctx: XErrorCtx, name: str, val: Any) -> XError:
         return XError(
             short="None object is not None",
-            what=f"{name} contains value {val} which is not None",
+            what="{name} contains value {val} which is not None",
             why="A None type object can only contain none",
             ctx=ctx,
+            values={"name": name, "val": val},
         )
 
     @staticmethod
@@ -230,6 +400,50 @@ class ErrorTypes:
             ctx=ctx,
         )
 
+    @staticmethod
+    def UnknownMember(cls: AnyType, tag: str, member_tags: list[str]) -> XError:
+        cls_name: str = typename(cls)
+        return XError(
+            short="Unknown member",
+            what=f"{cls_name} has no member with tag {tag}",
+            why=f"Only the members {', '.join(member_tags)} can be selected",
+            ctx=XErrorCtx([cls_name]),
+        )
+
+    @staticmethod
+    def NotProjectable(cls: AnyType) -> XError:
+        cls_name: str = typename(cls)
+        return XError(
+            short="Not Projectable",
+            what=f"{cls_name} cannot be parsed with only some of its members",
+            why=f"Selecting members requires an @xmlify dataclass, {cls_name} is manually xmlified",
+        )
+
+    @staticmethod
+    def InvalidXml(file_path: str, caught: Exception) -> XError:
+        return XError(
+            short="Invalid XML",
+            what="{file_path} could not be read as xml: {caught}",
+            why="Only well formed xml documents can be validated",
+            values={"file_path": file_path, "caught": caught},
+        )
+
+    @staticmethod
+    def ParseLimit(limit: str, maximum: int, tag: str) -> XError:
+        return XError(
+            short="Parse Limit Exceeded",
+            what=f"The document exceeds the maximum {limit} of {maximum} at {tag}",
+            why=f"Limits stop oversized documents being parsed, they can be raised with using_options",
+        )
+
+    @staticmethod
+    def UnknownCompression(codec: str, available: list[str]) -> XError:
+        return XError(
+            short="Unknown Compression",
+            what=f"{codec} is not one of the available codecs {', '.join(available)}",
+            why=f"Only compression from the standard library is supported (zstd requires python 3.14)",
+        )
+
     @staticmethod
     def MissingAttribute(
         cls: AnyType, required_attrs: set[str], missing_attr: str
@@ -2,53 +2,408 @@
 Easy file IO for users
 - Need to make it obvious when an xml has been overwritten
 - Easy parsing from a file
+- Caching parsed files
+- Compressed files (by extension, or an explicit compression)
 """
 
+import os
+import pickle
+import hashlib
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from threading import Event, Lock
+from humps import pascalize
 from pathlib import Path
-from typing import Any, TypeVar
+from typing import IO, Any, Callable, Iterable, Iterator, TypeVar
 from termcolor import colored
-from lxml.objectify import parse as objectify_parse
-from lxml.etree import _ElementTree
+from lxml.objectify import ObjectifiedElement
+from lxml.etree import (
+    _Element,
+    _ElementTree,
+    ElementTree,
+    XMLSyntaxError,
+    iterparse,
+    tostring,
+    xmlfile,
+    indent,
+)
 
-from xmlable._utils import typename
-from xmlable._xobject import is_xmlified
-from xmlable._errors import ErrorTypes
+from xmlable._utils import typename, some_or, AnyType
+from xmlable._xobject import XObject, is_xmlified
+from xmlable._errors import XError, XErrorCtx, ErrorTypes
+from xmlable._digest import XParsed, Digests
+from xmlable._compression import open_xml, Compression, READ_ERRORS
+from xmlable._parser import objectify_events, parse_xml, parse_xml_bytes
+from xmlable._lxml_helpers import resolve_nils, XMLSchema
+from xmlable._manual import dependency_order, xsd_schema
+from xmlable._schema import generating_schema
+from xmlable._options import using_options
 
 
-def write_file(file_path: str | Path, tree: _ElementTree):
+@contextmanager
+def overwriting(
+    file_path: str | Path, compression: Compression = "infer"
+) -> Iterator[IO[bytes]]:
     print(
         colored(f"Overwriting {file_path}", "red", attrs=["blink"]), end="..."
     )
-    with open(file=file_path, mode="wb") as f:
-        tree.write(f, xml_declaration=True, encoding="utf-8", pretty_print=True)
+    with open_xml(file_path, "wb", compression) as f:
+        yield f
     print(colored(f"Complete!", "green", attrs=["blink"]))
 
 
-def parse_file(cls: type, file_path: str | Path) -> Any:
+def write_file(
+    file_path: str | Path,
+    tree: _ElementTree,
+    canonical: bool = False,
+    pretty: bool = True,
+    compression: Compression = "infer",
+):
+    with overwriting(file_path, compression) as f:
+        write_tree(f, tree, canonical, pretty)
+
+
+def write_tree(
+    f: IO[bytes],
+    tree: _ElementTree,
+    canonical: bool = False,
+    pretty: bool = True,
+):
+    if canonical:
+        tree.write(f, method="c14n2", with_comments=False)
+    else:
+        tree.write(
+            f, xml_declaration=True, encoding="utf-8", pretty_print=pretty
+        )
+
+
+def parse_selected(
+    file_path: str | Path, tags: set[str], compression: Compression = "infer"
+) -> ObjectifiedElement:
+    """
+    Parse a file, dropping the subtrees of the root's children whose tags are
+    not in tags
+    - Dropped subtrees are cleared as they are parsed, so are never held whole
+    """
+    with open_xml(file_path, "rb", compression) as f:
+        root = None
+        depth = 0
+        skipping = False
+        for event, elem in objectify_events(f):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    root = elem
+                elif depth == 2:
+                    skipping = elem.tag not in tags
+            else:
+                if skipping and depth == 3:
+                    elem.clear()
+                    elem.getparent().remove(elem)  # type: ignore[union-attr]
+                depth -= 1
+        assert root is not None, "iterparse raises for empty documents"
+        return root
+
+
+def parse_cached(
+    cls: type,
+    file_path: str | Path,
+    cache_dir: Path,
+    compression: Compression = "infer",
+) -> Any:
+    """
+    Parse a file, reusing the result pickled by a previous parse of the same
+    contents with the same xml representation of cls
+    - Keyed by the uncompressed contents, so recompressing a file still hits
+    - Also keyed by the class's module and qualified name, as classes of the
+      same name (and members) in different modules have the same fingerprint
+    - Unreadable cache entries are ignored, and unpicklable results are not
+      cached
+    - The cache directory must be trusted (entries are unpickled)
+    """
+    with open_xml(file_path, "rb", compression) as f:
+        data = f.read()
+    h = hashlib.blake2b(data)
+    h.update(cls.xml_fingerprint().encode())  # type: ignore[attr-defined]
+    h.update(f"{cls.__module__}:{cls.__qualname__}".encode())
+    entry = cache_dir / f"{typename(cls)}-{h.hexdigest()}.pickle"
+
+    try:
+        with open(file=entry, mode="rb") as f:
+            cached = pickle.load(f)
+        if type(cached) is cls:
+            return cached
+    except Exception:
+        # JUSTIFY: A missing, stale or corrupt cache entry should never stop
+        #          the file from being parsed
+        pass
+
+    val = cls.parse(parse_xml_bytes(data))  # type: ignore[attr-defined]
+
+    # a temporary file unique to this write, as threads (and processes) may
+    # write the same entry concurrently
+    tmp: Path | None = None
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            prefix=f"{entry.stem}.", suffix=".tmp", dir=cache_dir
+        )
+        tmp = Path(tmp_name)
+        with os.fdopen(fd, mode="wb") as f:
+            pickle.dump(val, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, entry)
+    except (OSError, pickle.PicklingError, AttributeError, TypeError):
+        if tmp is not None:
+            tmp.unlink(missing_ok=True)
+    return val
+
+
+def parse_file(
+    cls: type,
+    file_path: str | Path,
+    only: Iterable[str] | None = None,
+    cache_dir: str | Path | None = None,
+    compression: Compression = "infer",
+) -> Any:
     """
     Parse a file, validate and produce instance of cls
+    - compression is inferred from the extension (.gz, .xz, .bz2, .zst), or
+      can be given (None for uncompressed)
+    - only selects the members to parse (by field name or tag), the subtrees
+      of other members are skipped, and the members set to their default
+      (or UNPARSED if they have none)
+    - cache_dir enables caching parsed results on disk, keyed by the file's
+      contents and cls's xml representation (only for parsing all members)
+    INV: cls must be an xmlified class
+    """
+    if not is_xmlified(cls):
+        raise ErrorTypes.NotXmlified(cls)
+    if only is None and cache_dir is not None:
+        return parse_cached(cls, file_path, Path(cache_dir), compression)
+    elif only is None:
+        with open_xml(file_path, "rb", compression) as f:
+            return cls.parse(parse_xml(f))  # type: ignore[attr-defined]
+    elif not hasattr(cls, "parse_only"):
+        raise ErrorTypes.NotProjectable(cls)
+    else:
+        only = list(only)
+        tags = {pascalize(name) for name in only}
+        selected = parse_selected(file_path, tags, compression)
+        return cls.parse_only(selected, only)  # type: ignore[attr-defined]
+
+
+def validate_file(
+    cls: type, file_path: str | Path, compression: Compression = "infer"
+) -> list[XError]:
+    """
+    Check a file can be parsed as an instance of cls, returning every error
+    found (empty if valid)
+    - Nothing is built, so is faster than parsing (see cls.validate)
     INV: cls must be an xmlified class
     """
     if not is_xmlified(cls):
         raise ErrorTypes.NotXmlified(cls)
-    with open(file=file_path, mode="r") as f:
-        return cls.parse(objectify_parse(f).getroot())  # type: ignore[attr-defined]
+    try:
+        with open_xml(file_path, "rb", compression) as f:
+            root = parse_xml(f)
+    except XMLSyntaxError as e:
+        return [ErrorTypes.InvalidXml(str(file_path), e)]
+    except READ_ERRORS as e:
+        return [ErrorTypes.InvalidXml(str(file_path), e)]
+    except XError as e:
+        return [e]
+    return cls.validate(root)  # type: ignore[attr-defined, no-any-return]
 
 
 def write_xsd(
     file_path: str | Path,
     cls: type,
-    namespaces: dict[str, str] = {},
-    imports: dict[str, str] = {},
+    namespaces: dict[str, str] | None = None,
+    imports: dict[str, str] | None = None,
+    pretty: bool = True,
+    compression: Compression = "infer",
+    comments: bool = True,
 ):
     if not is_xmlified(cls):
         raise ErrorTypes.NonXMlifiedType(typename(cls))
     else:
-        write_file(file_path, cls.xsd(namespaces=namespaces, imports=imports))  # type: ignore[attr-defined]
+        write_file(
+            file_path,
+            cls.xsd(namespaces=namespaces, imports=imports, comments=comments),  # type: ignore[attr-defined]
+            pretty=pretty,
+            compression=compression,
+        )
+
+
+def schema_version(file_path: Path) -> str | None:
+    """The version attribute of a schema file's root (None if unreadable)"""
+    try:
+        with open(file=file_path, mode="rb") as f:
+            for _, elem in iterparse(f, events=("start",)):
+                return elem.get("version")  # type: ignore[no-any-return]
+    except Exception:
+        # JUSTIFY: Missing, or invalid files are rewritten
+        pass
+    return None
+
+
+def schema_includes(file_path: Path) -> list[str]:
+    """The files a schema file includes (none if unreadable)"""
+    includes: list[str] = []
+    try:
+        with open(file=file_path, mode="rb") as f:
+            for _, elem in iterparse(f, events=("start",)):
+                if elem.tag == f"{XMLSchema}include":
+                    includes.append(elem.get("schemaLocation", ""))
+                elif elem.tag not in (
+                    f"{XMLSchema}schema",
+                    f"{XMLSchema}import",
+                ):
+                    # includes precede the declarations
+                    break
+    except Exception:
+        # JUSTIFY: Missing, or invalid files include nothing
+        pass
+    return includes
+
+
+def included_schemas(dir_path: Path, file_name: str) -> set[str]:
+    """A schema file, and the files it includes (transitively) in dir_path"""
+    found = {file_name}
+    frontier = [file_name]
+    while frontier:
+        for include in schema_includes(dir_path / frontier.pop()):
+            # only files in dir_path (as written by write_xsd_modules)
+            if Path(include).name == include and include not in found:
+                found.add(include)
+                frontier.append(include)
+    return found
+
+
+def write_xsd_modules(
+    dir_path: str | Path,
+    cls: type,
+    id: str | None = None,
+    namespaces: dict[str, str] | None = None,
+    imports: dict[str, str] | None = None,
+) -> list[Path]:
+    """
+    Write the xsd for cls split into a file per python module (`module.xsd`),
+    with a root `id.xsd` declaring the root element
+    - Files include the files of the modules they depend on
+    - Named types are prefixed with their file's module, so are not declared
+      twice
+    - Each schema's version is a fingerprint of the classes it declares, files
+      with an unchanged fingerprint are not regenerated
+    - Module files the previous root `id.xsd` included, that are no longer
+      generated (and are not included by other schemas in dir_path), are
+      removed
+    - Returns the files written
+    """
+    if not is_xmlified(cls):
+        raise ErrorTypes.NonXMlifiedType(typename(cls))
+
+    dir_path = Path(dir_path)
+    dir_path.mkdir(parents=True, exist_ok=True)
+    schema_id: str = some_or(id, typename(cls))
+    base_namespaces: dict[str, str] = some_or(namespaces, {})
+    schema_imports: dict[str, str] = some_or(imports, {})
+
+    root_name = f"{schema_id}.xsd"
+    previous = included_schemas(dir_path, root_name)
+
+    # group classes by module, each in dependency order
+    modules: dict[str, list[AnyType]] = {}
+    for dep in dependency_order(cls):
+        modules.setdefault(dep.__module__, []).append(dep)
+
+    def write_if_changed(
+        file_name: str,
+        fingerprint: Iterable[str],
+        includes: list[str],
+        generate: Callable[[dict[str, str]], list[_Element]],
+    ) -> Path | None:
+        h = hashlib.sha256()
+        for part in [
+            *fingerprint,
+            *includes,
+            *base_namespaces.items(),
+            *schema_imports.items(),
+        ]:
+            h.update(f"{part};".encode())
+        version = h.hexdigest()
+        file_path = dir_path / file_name
+        if schema_version(file_path) == version:
+            return None
+
+        file_namespaces = dict(base_namespaces)
+        declarations = generate(file_namespaces)
+        schema = xsd_schema(
+            file_name.removesuffix(".xsd"),
+            file_namespaces,
+            schema_imports,
+            declarations,
+            includes,
+            version,
+        )
+        write_file(file_path, ElementTree(schema))
+        return file_path
+
+    written: list[Path] = []
+    for module, classes in modules.items():
+
+        def declare_module(add_ns: dict[str, str]) -> list[_Element]:
+            with generating_schema(add_ns, prefix=f"{module}.") as schema:
+                decs = [c.xsd_forward(add_ns) for c in classes]  # type: ignore[attr-defined]
+            return decs + schema.types
+
+        included = sorted(
+            {
+                f"{dep.__module__}.xsd"
+                for c in classes
+                for dep in c.xsd_dependencies()  # type: ignore[attr-defined]
+                if dep.__module__ != module
+            }
+        )
+        fingerprints = [
+            f"{typename(c)}:{c.xml_fingerprint()}" for c in classes  # type: ignore[attr-defined]
+        ]
+        if path := write_if_changed(
+            f"{module}.xsd", fingerprints, included, declare_module
+        ):
+            written.append(path)
+
+    def declare_root(add_ns: dict[str, str]) -> list[_Element]:
+        with generating_schema(add_ns, prefix=f"{schema_id}.") as schema:
+            main_element = cls.get_xobject().xsd_out(schema_id, add_ns=add_ns)  # type: ignore[attr-defined]
+        return schema.types + [main_element]
+
+    if path := write_if_changed(
+        root_name,
+        [schema_id, cls.xml_fingerprint()],  # type: ignore[attr-defined]
+        [f"{cls.__module__}.xsd"],
+        declare_root,
+    ):
+        written.append(path)
+
+    # files of modules no longer depended on, unless shared with other roots
+    stale = previous - {f"{module}.xsd" for module in modules} - {root_name}
+    for other in dir_path.glob("*.xsd"):
+        if other.name not in stale:
+            stale.difference_update(schema_includes(other))
+    for file_name in stale:
+        (dir_path / file_name).unlink(missing_ok=True)
+    return written
 
 
 def write_xml_template(
-    file_path: str | Path, cls: type, schema_name: str | None = None
+    file_path: str | Path,
+    cls: type,
+    schema_name: str | None = None,
+    pretty: bool = True,
+    compression: Compression = "infer",
 ):
     if not is_xmlified(cls):
         raise ErrorTypes.NonXMlifiedType(typename(cls))
@@ -56,12 +411,326 @@ def write_xml_template(
         schema_id: str = (
             schema_name if schema_name is not None else typename(cls)
         )
-        write_file(file_path, cls.xml(schema_id))  # type: ignore[attr-defined]
+        write_file(
+            file_path,
+            cls.xml(schema_id),  # type: ignore[attr-defined]
+            pretty=pretty,
+            compression=compression,
+        )
 
 
-def write_xml_value(file_path: str | Path, val: Any):
+def write_xml_value(
+    file_path: str | Path,
+    val: Any,
+    canonical: bool = False,
+    pretty: bool = True,
+    compression: Compression = "infer",
+    comments: bool = True,
+    sparse: bool = False,
+):
+    """
+    Write the xml for val
+    - canonical output is C14N 2.0 with sorted sets and dictionaries, so equal
+      values always produce the same bytes (see canonical_xml)
+    - pretty=False writes without indentation (smaller, faster to parse)
+    - comments=False omits informational comments (e.g. for empty lists)
+    - sparse=True omits members equal to their default (restored on parse)
+    - compression is inferred from the extension (.gz, .xz, .bz2, .zst), or
+      can be given (None for uncompressed)
+    """
     cls = type(val)
     if not is_xmlified(cls):
         raise ErrorTypes.NonXMlifiedType(typename(cls))
     else:
-        write_file(file_path, val.xml_value())  # type: ignore[attr-defined]
+        write_file(
+            file_path,
+            val.xml_value(canonical=canonical, comments=comments, sparse=sparse),  # type: ignore[attr-defined]
+            canonical=canonical,
+            pretty=pretty,
+            compression=compression,
+        )
+
+
+def write_xml_values(
+    file_path: str | Path,
+    cls: type,
+    values: Iterable[Any],
+    root: str = "Records",
+    pretty: bool = True,
+    compression: Compression = "infer",
+    comments: bool = True,
+    sparse: bool = False,
+):
+    """
+    Write many values of cls into one document (as with cls.xml_values)
+    - Streamed, each value is written as it is produced, so values can be a
+      generator larger than memory
+    INV: cls must be an xmlified class
+    """
+    if not is_xmlified(cls):
+        raise ErrorTypes.NonXMlifiedType(typename(cls))
+
+    cls_name = typename(cls)
+    xobject: XObject = cls.get_xobject()  # type: ignore[attr-defined]
+    ctx = XErrorCtx([root])
+    with (
+        using_options(comments=comments, sparse=sparse),
+        overwriting(file_path, compression) as f,
+        xmlfile(f, encoding="utf-8") as xf,
+    ):
+        xf.write_declaration()
+        with xf.element(root):
+            for i, val in enumerate(values):
+                elem = resolve_nils(
+                    xobject.xml_out(cls_name, val, ctx.next(f"{cls_name}[{i}]"))
+                )
+                if pretty:
+                    xf.write("\n  ")
+                    indent(elem, level=1)
+                xf.write(elem)
+            if pretty:
+                xf.write("\n")
+
+
+def canonical_xml(val: Any) -> bytes:
+    """
+    The canonical xml for val
+    - Equal values produce identical bytes, so can be hashed/compared without
+      parsing
+    - Sets and dictionaries are sorted by the canonical xml of their items and
+      keys, serialized as C14N 2.0 (no declaration, comments or whitespace)
+    """
+    cls = type(val)
+    if not is_xmlified(cls):
+        raise ErrorTypes.NonXMlifiedType(typename(cls))
+    tree = val.xml_value(canonical=True, comments=False)  # type: ignore[attr-defined]
+    return tostring(tree, method="c14n2", with_comments=False)  # type: ignore[no-any-return]
+
+
+class IncrementalParser:
+    """
+    Parses successive versions of a document
+    - Values parsed from subtrees unchanged since the last parse are reused
+      (so unchanged parts keep their identity)
+    - Only changed subtrees are parsed
+    - Safe to share between threads (parses are one at a time)
+    INV: cls must be an xmlified class
+    """
+
+    def __init__(self, cls: type):
+        if not is_xmlified(cls):
+            raise ErrorTypes.NotXmlified(cls)
+        self.xobject: XObject = cls.get_xobject()  # type: ignore[attr-defined]
+        self.previous: XParsed | None = None
+        self._lock = Lock()
+
+    def parse(self, obj: ObjectifiedElement) -> Any:
+        digests = Digests(obj)
+        with self._lock:
+            self.previous = self.xobject.xml_in_reuse(
+                obj, XErrorCtx([obj.tag]), self.previous, digests
+            )
+            return self.previous.val
+
+    def parse_file(
+        self, file_path: str | Path, compression: Compression = "infer"
+    ) -> Any:
+        with open_xml(file_path, "rb", compression) as f:
+            return self.parse(parse_xml(f))
+
+
+@dataclass(frozen=True)
+class FileIdentity:
+    """
+    Identifies the version of a file, if unchanged the file need not be
+    reparsed
+    """
+
+    mtime_ns: int
+    size: int
+    inode: int
+    digest: str | None = None
+
+    @staticmethod
+    def of(file_path: Path, hash_contents: bool = False) -> "FileIdentity":
+        stat = os.stat(file_path)
+        if hash_contents:
+            with open(file=file_path, mode="rb") as f:
+                digest = hashlib.file_digest(f, "blake2b").hexdigest()
+        else:
+            digest = None
+        return FileIdentity(stat.st_mtime_ns, stat.st_size, stat.st_ino, digest)
+
+    def same_stat(self, other: "FileIdentity") -> bool:
+        return (self.mtime_ns, self.size, self.inode) == (
+            other.mtime_ns,
+            other.size,
+            other.inode,
+        )
+
+
+class ConfigCache:
+    """
+    A cache of parsed files, reparsing only when a file changes
+    - Files are identified by mtime, size and inode, and optionally a hash of
+      their contents (so files touched, but not changed are not reparsed)
+    - At most maxsize files are kept, the least recently used are evicted
+    - If incremental, changed files reuse the values parsed from their
+      unchanged parts (see IncrementalParser)
+    - Safe to share between threads
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        hash_contents: bool = False,
+        incremental: bool = False,
+    ):
+        self.maxsize = maxsize
+        self.hash_contents = hash_contents
+        self.incremental = incremental
+        self._entries: OrderedDict[
+            tuple[Path, type], tuple[FileIdentity, Any]
+        ] = OrderedDict()
+        self._parsers: dict[tuple[Path, type], IncrementalParser] = {}
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _identity(
+        self, file_path: Path, previous: FileIdentity | None
+    ) -> FileIdentity:
+        stat_only = FileIdentity.of(file_path)
+        if previous is not None and previous.same_stat(stat_only):
+            return previous
+        elif self.hash_contents:
+            return FileIdentity.of(file_path, hash_contents=True)
+        else:
+            return stat_only
+
+    def _changed(self, previous: FileIdentity, current: FileIdentity) -> bool:
+        if self.hash_contents:
+            return previous.digest != current.digest
+        else:
+            return previous != current
+
+    def _parse(self, key: tuple[Path, type]) -> Any:
+        path, cls = key
+        if not self.incremental:
+            return parse_file(cls, path)
+        with self._lock:
+            parser = self._parsers.get(key)
+            if parser is None:
+                parser = self._parsers[key] = IncrementalParser(cls)
+        return parser.parse_file(path)
+
+    def _refresh(
+        self,
+        key: tuple[Path, type],
+        previous: FileIdentity,
+        identity: FileIdentity,
+    ):
+        """
+        Keep the new identity of a file that was touched but is unchanged, so
+        its contents are not hashed again (unless reparsed meanwhile)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is previous:
+                self._entries[key] = (identity, entry[1])
+
+    def _store(self, key: tuple[Path, type], identity: FileIdentity, val: Any):
+        with self._lock:
+            self._entries[key] = (identity, val)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                evicted, _ = self._entries.popitem(last=False)
+                self._parsers.pop(evicted, None)
+
+    def get(self, cls: type, file_path: str | Path) -> Any:
+        """
+        Get the parsed instance of cls from the file, parsing only if the file
+        is not cached, or has changed
+        """
+        key = (Path(file_path).resolve(), cls)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        previous = entry[0] if entry is not None else None
+        identity = self._identity(key[0], previous)
+        if entry is not None and not self._changed(entry[0], identity):
+            if identity is not entry[0]:
+                self._store(key, identity, entry[1])
+            return entry[1]
+
+        val = self._parse(key)
+        self._store(key, identity, val)
+        return val
+
+    def invalidate(self, file_path: str | Path | None = None):
+        """Drop a file (or all files if None) from the cache"""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+                self._parsers.clear()
+            else:
+                path = Path(file_path).resolve()
+                for key in [k for k in self._entries if k[0] == path]:
+                    del self._entries[key]
+                    self._parsers.pop(key, None)
+
+    def poll(
+        self, on_error: Callable[[Path, Exception], None] | None = None
+    ) -> list[tuple[Path, Any]]:
+        """
+        Reparse all cached files that have changed, returning their new values
+        - Files that have been removed are dropped from the cache
+        - Files that fail to parse keep their previous value (and are retried
+          on the next poll), the error is passed to on_error
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+
+        updated = []
+        for key, (previous, _) in entries:
+            path, cls = key
+            try:
+                identity = self._identity(path, previous)
+                if not self._changed(previous, identity):
+                    if identity is not previous:
+                        self._refresh(key, previous, identity)
+                    continue
+                val = self._parse(key)
+            except FileNotFoundError:
+                with self._lock:
+                    self._entries.pop(key, None)
+                    self._parsers.pop(key, None)
+                continue
+            except Exception as e:
+                if on_error is not None:
+                    on_error(path, e)
+                continue
+            with self._lock:
+                if key in self._entries:
+                    self._entries[key] = (identity, val)
+            updated.append((path, val))
+        return updated
+
+    def watch(
+        self,
+        on_change: Callable[[Path, Any], None],
+        interval: float = 1.0,
+        stop: Event | None = None,
+        on_error: Callable[[Path, Exception], None] | None = None,
+    ):
+        """
+        Poll the cached files every interval seconds until stop is set, calling
+        on_change with the path and new value of each changed file
+        """
+        stopped: Event = some_or(stop, Event())
+        while not stopped.wait(interval):
+            for path, val in self.poll(on_error):
+                on_change(path, val)
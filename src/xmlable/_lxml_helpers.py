@@ -4,11 +4,18 @@ Helper functions for wrangling to lxml library
 """
 
 from lxml.objectify import ObjectifiedElement
-from lxml.etree import _Element
-from typing import Iterable
+from lxml.etree import Element, _Element, tostring
+from typing import Callable, Iterable, cast
 
 XMLURL = r"http://www.w3.org/2001/XMLSchema"
 XMLSchema = r"{http://www.w3.org/2001/XMLSchema}"
+XSIURL = r"http://www.w3.org/2001/XMLSchema-instance"
+XSINil = r"{http://www.w3.org/2001/XMLSchema-instance}nil"
+
+# JUSTIFY: Elements with a namespaced attribute are slow to append (lxml
+#          reconciles namespaces on every move), so nil elements are marked
+#          while building, and given xsi:nil once complete (see resolve_nils)
+NilMark = "xmlable-nil"
 
 
 def with_text(e: _Element, text: str) -> _Element:
@@ -26,6 +33,38 @@ def with_child(parent: _Element, child: _Element) -> _Element:
     return with_children(parent, [child])
 
 
+def canonical_bytes(e: _Element) -> bytes:
+    return tostring(e, method="c14n2", with_comments=False)
+
+
+def sorted_children(parent: _Element, key: Callable[[_Element], bytes]):
+    """Sort the child elements of parent in place (dropping comments)"""
+    parent[:] = sorted((c for c in parent if isinstance(c.tag, str)), key=key)
+
+
+def nil_element(name: str) -> _Element:
+    return Element(name, {NilMark: "true"})
+
+
+def resolve_nils(e: _Element) -> _Element:
+    """
+    Replace the marks of nil elements in e with xsi:nil, declaring xsi once
+    (returns the new root if any were marked)
+    """
+    marked = cast(list[_Element], e.xpath(f"descendant-or-self::*[@{NilMark}]"))
+    if len(marked) == 0:
+        return e
+    nsmap: dict[str, str] = {**e.nsmap, "xsi": XSIURL}  # type: ignore[dict-item]
+    root = Element(e.tag, dict(e.attrib), nsmap=nsmap)  # type: ignore[misc]
+    root.text = e.text
+    root.extend(e)
+    for elem in marked:
+        elem = root if elem is e else elem
+        del elem.attrib[NilMark]
+        elem.set(XSINil, "true")
+    return root
+
+
 def children(obj: ObjectifiedElement) -> Iterable[ObjectifiedElement]:
     def not_comment(child_obj: ObjectifiedElement):
         return child_obj.tag != "comment"
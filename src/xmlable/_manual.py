@@ -4,13 +4,28 @@ methods to a class that already has .xsd_dependencies, .xsd_forward and
 .get_xobject
 """
 
-from typing import Any
-from lxml.etree import _Element, Element, _ElementTree, ElementTree
+from collections import deque
+from functools import cache
+from hashlib import sha256
+from struct import error as StructError
+from typing import Any, Iterable, Iterator
+from lxml.etree import (
+    _Element,
+    Element,
+    _ElementTree,
+    ElementTree,
+    XMLSyntaxError,
+    tostring,
+)
 from lxml.objectify import ObjectifiedElement
 
 from xmlable._utils import typename, AnyType, ordered_iter
-from xmlable._lxml_helpers import with_children, XMLSchema
+from xmlable._lxml_helpers import with_children, resolve_nils, XMLSchema
 from xmlable._errors import XError, XErrorCtx, ErrorTypes
+from xmlable._xobject import ListObj
+from xmlable._binary import MAGIC, FINGERPRINT_BYTES
+from xmlable._options import using_options
+from xmlable._schema import generating_schema
 
 
 def validate_manual_class(cls: AnyType):
@@ -20,22 +35,115 @@ def validate_manual_class(cls: AnyType):
             raise ErrorTypes.MissingAttribute(cls, attrs, attr)
 
 
-def type_cycle(from_type: AnyType) -> list[AnyType]:
-    # INV: it is an xmlified type for a user define structure
-    cycle: list[AnyType] = []
+def dependency_cycle(start: AnyType, component: set[AnyType]) -> list[AnyType]:
+    """
+    A cycle of dependencies from start back to itself, within a strongly
+    connected component (so one must exist)
+    """
+    came_from: dict[AnyType, AnyType] = {}
+    frontier = deque([start])
+    while frontier:
+        curr = frontier.popleft()
+        for dep in ordered_iter(curr.xsd_dependencies()):  # type: ignore[attr-defined]
+            if dep is start and curr is not start:
+                # walk back, so each type is followed by one depending on it
+                cycle = [start, curr]
+                while curr is not start:
+                    curr = came_from[curr]
+                    cycle.append(curr)
+                return cycle
+            elif dep in component and dep not in came_from:
+                came_from[dep] = curr
+                frontier.append(dep)
+    assert False, "a strongly connected component has a cycle"
+
+
+def dependency_order(root: AnyType) -> list[AnyType]:
+    """
+    The user defined types root depends on (including root), each after its
+    dependencies
+    - An iterative Tarjan's SCC, so linear in the size of the dependency graph
+      and not limited by the recursion limit
+    - Dependencies are visited ordered by name, so the order is deterministic
+    - Types can depend on themselves, other cycles raise a DependencyCycle
+    """
+    index: dict[AnyType, int] = {}
+    lowlink: dict[AnyType, int] = {}
+    stack: list[AnyType] = []
+    on_stack: set[AnyType] = set()
+    order: list[AnyType] = []
+
+    # the types being visited, with their dependencies still to visit
+    visiting: list[tuple[AnyType, Iterator[AnyType]]] = []
 
-    def visit_dep(curr: AnyType) -> bool:
-        if curr == from_type or any(
-            visit_dep(dep) for dep in ordered_iter(curr.xsd_dependencies())  # type: ignore[attr-defined]
-        ):
-            cycle.append(curr)
-            return True
+    def visit(t: AnyType):
+        index[t] = lowlink[t] = len(index)
+        stack.append(t)
+        on_stack.add(t)
+        deps = ordered_iter(t.xsd_dependencies())  # type: ignore[attr-defined]
+        visiting.append((t, iter(d for d in deps if d is not t)))
+
+    visit(root)
+    while visiting:
+        curr, deps = visiting[-1]
+        for dep in deps:
+            if dep not in index:
+                visit(dep)
+                break
+            elif dep in on_stack:
+                lowlink[curr] = min(lowlink[curr], index[dep])
         else:
-            return False
+            visiting.pop()
+            if visiting:
+                parent, _ = visiting[-1]
+                lowlink[parent] = min(lowlink[parent], lowlink[curr])
+            if lowlink[curr] == index[curr]:
+                component: set[AnyType] = set()
+                while (member := stack.pop()) is not curr:
+                    on_stack.remove(member)
+                    component.add(member)
+                on_stack.remove(curr)
+                if len(component) > 0:
+                    component.add(curr)
+                    raise ErrorTypes.DependencyCycle(
+                        dependency_cycle(curr, component)
+                    )
+                order.append(curr)
+    return order
+
 
-    assert visit_dep(from_type)
-    cycle.append(from_type)
-    return cycle
+def xsd_schema(
+    id: str,
+    namespaces: dict[str, str],
+    imports: dict[str, str],
+    declarations: list[_Element],
+    includes: Iterable[str] = (),
+    version: str | None = None,
+) -> _Element:
+    """
+    An xs:schema element, with imports (namespace to schema location) and
+    includes (schema locations) before the declarations
+    """
+    schema = Element(
+        f"{XMLSchema}schema",
+        id=id,
+        elementFormDefault="qualified",
+        nsmap=namespaces,
+    )
+    if version is not None:
+        schema.set("version", version)
+    return with_children(
+        schema,
+        [
+            Element(f"{XMLSchema}import", namespace=ns, schemaLocation=sloc)
+            for ns, sloc in imports.items()
+        ]
+        + [
+            Element(f"{XMLSchema}include", schemaLocation=sloc)
+            for sloc in includes
+        ]
+        + declarations,
+    )
 
 
 def manual_xmlify(cls: type) -> type:
@@ -44,19 +152,41 @@ def manual_xmlify(cls: type) -> type:
     ```
     def xsd(
             id: str = cls_name,
-            namespaces: dict[str, str] = {},
-            imports: dict[str, str] = {},
+            namespaces: dict[str, str] | None = None,
+            imports: dict[str, str] | None = None,
+            comments: bool = True,
         ) -> _ElementTree:
         # ...
 
     def xml(schema_name: str = cls_name) -> _ElementTree:
         # ...
 
-    def xml_value(self, id: str = cls_name) -> _ElementTree:
+    def xml_value(self, id: str = cls_name, canonical: bool = False, comments: bool = True, sparse: bool = False) -> _ElementTree:
+        # ...
+
+    def xml_values(values: Iterable[Any], root: str = "Records", canonical: bool = False, comments: bool = True, sparse: bool = False) -> _ElementTree:
         # ...
 
     def parse(obj: ObjectifiedElement) -> Any:
         # ...
+
+    def validate(obj: ObjectifiedElement) -> list[XError]:
+        # ...
+
+    def xml_fingerprint() -> str:
+        # ...
+
+    def to_binary(self) -> bytes:
+        # ...
+
+    def from_binary(buf: bytes) -> Any:
+        # ...
+
+    def to_plain(self) -> Any:
+        # ...
+
+    def from_plain(obj: Any) -> Any:
+        # ...
     ```
     """
     try:
@@ -65,69 +195,153 @@ def manual_xmlify(cls: type) -> type:
 
         cls_xobject = cls.get_xobject()  # type: ignore[attr-defined]
 
+        @cache
+        def dependencies() -> list[AnyType]:
+            return dependency_order(cls)
+
         def xsd(
             id: str = cls_name,
-            namespaces: dict[str, str] = {},
-            imports: dict[str, str] = {},
+            namespaces: dict[str, str] | None = None,
+            imports: dict[str, str] | None = None,
+            comments: bool = True,
         ) -> _ElementTree:
             # Get dependencies (user classes that need to be declared before)
-            visited: set[AnyType] = set()
-            dec_order: list[AnyType] = []
+            dec_order = dependencies()
 
-            def toposort(
-                curr: AnyType, visited: set[AnyType], dec_order: list[AnyType]
+            # JUSTIFY: namespaces are copied, so the caller's (or the default)
+            #          dictionary is not changed by generating the schema
+            namespaces = dict(namespaces or {})
+            with (
+                using_options(comments=comments),
+                generating_schema(namespaces) as schema,
             ):
-                if curr in visited:
-                    raise ErrorTypes.DependencyCycle(type_cycle(curr))
-                visited.add(curr)
-                deps = curr.xsd_dependencies()  # type: ignore[attr-defined]
-                for d in ordered_iter(deps):
-                    if d not in visited:
-                        toposort(d, visited, dec_order)
-                dec_order.append(curr)
-
-            toposort(cls, visited, dec_order)
+                # Create forward declarations, potentially adding to namespaces
+                decs: list[_Element] = [dec.xsd_forward(namespaces) for dec in dec_order]  # type: ignore[attr-defined]
 
-            # Create forward declarations, potentially adding to namespaces
-            decs: list[_Element] = [dec.xsd_forward(namespaces) for dec in dec_order]  # type: ignore[attr-defined]
-
-            # generate main element (can add to namespaces)
-            main_element = cls_xobject.xsd_out(id, add_ns=namespaces)
+                # generate main element (can add to namespaces)
+                main_element = cls_xobject.xsd_out(id, add_ns=namespaces)
 
             return ElementTree(
-                with_children(
-                    Element(
-                        f"{XMLSchema}schema",
-                        id=id,
-                        elementFormDefault="qualified",
-                        nsmap=namespaces,
-                    ),
-                    [
-                        Element(
-                            f"{XMLSchema}import",
-                            namespace=ns,
-                            schemaLocation=sloc,
-                        )
-                        for ns, sloc in imports.items()
-                    ]
-                    + decs
-                    + [main_element],
+                xsd_schema(
+                    id,
+                    namespaces,
+                    imports or {},
+                    decs + schema.types + [main_element],
                 )
             )
 
         def xml(schema_name: str = cls_name) -> _ElementTree:
             return ElementTree(cls_xobject.xml_temp(schema_name))
 
-        def xml_value(self, id: str = cls_name) -> _ElementTree:
-            return ElementTree(cls_xobject.xml_out(id, self, XErrorCtx([id])))
+        def xml_value(
+            self,
+            id: str = cls_name,
+            canonical: bool = False,
+            comments: bool = True,
+            sparse: bool = False,
+        ) -> _ElementTree:
+            with using_options(
+                canonical=canonical, comments=comments, sparse=sparse
+            ):
+                return ElementTree(
+                    resolve_nils(cls_xobject.xml_out(id, self, XErrorCtx([id])))
+                )
+
+        # a document of many values, each an element named for the class
+        records_xobject = ListObj(cls_xobject, cls_name)
+
+        def xml_values(
+            values: Iterable[Any],
+            root: str = "Records",
+            canonical: bool = False,
+            comments: bool = True,
+            sparse: bool = False,
+        ) -> _ElementTree:
+            with using_options(
+                canonical=canonical, comments=comments, sparse=sparse
+            ):
+                return ElementTree(
+                    resolve_nils(
+                        records_xobject.xml_out(
+                            root, list(values), XErrorCtx([root])
+                        )
+                    )
+                )
 
         def parse(obj: ObjectifiedElement) -> Any:
             return cls_xobject.xml_in(obj, XErrorCtx([obj.tag]))
 
+        def validate(obj: ObjectifiedElement) -> list[XError]:
+            errors: list[XError] = []
+            cls_xobject.xml_check(obj, XErrorCtx([obj.tag]), errors)
+            return errors
+
+        @cache
+        def xml_fingerprint() -> str:
+            """
+            A digest of the class's xml representation, including those of its
+            dependencies (so classes with the same fingerprint produce and
+            parse the same xml)
+            """
+            h = sha256(cls_name.encode())
+            h.update(cls_xobject.xml_signature().encode())
+            h.update(tostring(cls.xsd_forward({}), method="c14n"))  # type: ignore[attr-defined]
+            for dep_fingerprint in sorted(
+                dep.xml_fingerprint()
+                for dep in cls.xsd_dependencies()  # type: ignore[attr-defined]
+                if dep is not cls
+            ):
+                h.update(dep_fingerprint.encode())
+            return h.hexdigest()
+
+        def binary_header() -> bytes:
+            fingerprint = bytes.fromhex(cls.xml_fingerprint())  # type: ignore[attr-defined]
+            return MAGIC + fingerprint[:FINGERPRINT_BYTES]
+
+        def to_binary(self) -> bytes:
+            out = bytearray(binary_header())
+            cls_xobject.bin_out(self, XErrorCtx([cls_name]), out)
+            return bytes(out)
+
+        def from_binary(buf: bytes) -> Any:
+            header = binary_header()
+            if buf[: len(header)] != header:
+                raise ErrorTypes.BinaryMismatch(cls)
+            view = memoryview(buf)
+            try:
+                val, pos = cls_xobject.bin_in(
+                    view, len(header), XErrorCtx([cls_name])
+                )
+            except (IndexError, ValueError, StructError, XMLSyntaxError) as e:
+                # XMLSyntaxError from values embedded as xml (the default)
+                raise ErrorTypes.InvalidBinary(cls, str(e))
+            if pos != len(view):
+                raise ErrorTypes.InvalidBinary(
+                    cls, f"{len(view) - pos} unexpected bytes after the value"
+                )
+            return val
+
+        def to_plain(self) -> Any:
+            return cls_xobject.plain_out(self, XErrorCtx([cls_name]))
+
+        def from_plain(obj: Any) -> Any:
+            return cls_xobject.plain_in(obj, XErrorCtx([cls_name]))
+
         cls.xsd = xsd  # type: ignore[attr-defined]
         cls.xml = xml  # type: ignore[attr-defined]
         setattr(cls, "xml_value", xml_value)  # needs to use self to get values
+        cls.xml_values = xml_values  # type: ignore[attr-defined]
         cls.parse = parse  # type: ignore[attr-defined]
+        cls.validate = validate  # type: ignore[attr-defined]
+        setattr(cls, "to_binary", to_binary)  # needs to use self to get values
+        cls.from_binary = from_binary  # type: ignore[attr-defined]
+        setattr(cls, "to_plain", to_plain)  # needs to use self to get values
+        cls.from_plain = from_plain  # type: ignore[attr-defined]
+
+        # JUSTIFY: @xmlify classes provide a fingerprint of their members,
+        #          manual classes are described by their xsd
+        if "xml_fingerprint" not in vars(cls):
+            cls.xml_fingerprint = xml_fingerprint  # type: ignore[attr-defined]
 
         return cls
     except XError as e:
@@ -0,0 +1,51 @@
+"""
+Options for producing and parsing xml
+- Set for the duration of a call (e.g. `val.xml_value(canonical=True)`), so
+  they do not need to be passed through every xobject (including custom ones)
+- Held in a context variable, so are per thread/task
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from typing import Any, Iterator
+
+
+@dataclass(frozen=True)
+class XOptions:
+    # sets and dictionaries are sorted, so equal values produce the same xml
+    canonical: bool = False
+
+    # informational comments in values and schemas (templates always have them)
+    comments: bool = True
+
+    # members equal to their dataclass default are omitted from values
+    sparse: bool = False
+
+    # limits on parsed documents (None for no limit), see _parser
+    max_depth: int | None = None
+    max_elements: int | None = None
+    max_text: int | None = None
+
+    # allow documents beyond libxml2's own limits (e.g. text over 10MB)
+    huge_tree: bool = False
+
+
+OPTIONS: ContextVar[XOptions] = ContextVar(
+    "xmlable_options", default=XOptions()
+)
+
+
+def options() -> XOptions:
+    return OPTIONS.get()
+
+
+@contextmanager
+def using_options(**changes: Any) -> Iterator[XOptions]:
+    """Set some options within the with block"""
+    opts = replace(OPTIONS.get(), **changes)
+    token = OPTIONS.set(opts)
+    try:
+        yield opts
+    finally:
+        OPTIONS.reset(token)
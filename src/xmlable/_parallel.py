@@ -0,0 +1,212 @@
+"""
+Parallel parsing of files with large lists and dictionaries
+- The items of the root's list/dictionary members are split into chunks of
+  chunk_size items, chunk i is parsed by worker i % workers
+- Each worker streams the file, keeping only the items of its own chunks
+  (each chunk is built, then dropped), so no process holds the whole tree.
+  The parent streams the file for the other members, dropping the items
+- Workers rebuild the xobject for the member from the class (by xml_step), so
+  only the class (by reference), the file's path and the options are sent
+"""
+
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, fields
+from itertools import chain
+from pathlib import Path
+from typing import Any
+from lxml.objectify import ObjectifiedElement
+
+from xmlable._utils import some_or, typename
+from xmlable._errors import XErrorCtx, ErrorTypes
+from xmlable._xobject import XStep, ListObj, DictObj, is_xmlified
+from xmlable._compression import open_xml, Compression
+from xmlable._parser import objectify_events
+from xmlable._options import XOptions, options, using_options
+from xmlable._io import parse_file, parse_selected
+
+
+def container_steps(cls: type) -> dict[str, XStep]:
+    """The steps to the root's list and dictionary members, by member name"""
+    ctx = XErrorCtx([typename(cls)])
+    xobject = cls.get_xobject()  # type: ignore[attr-defined]
+    steps = {}
+    for cls_field in fields(cls):
+        step = xobject.xml_step(cls_field.name, ctx)
+        if isinstance(step.xobject, ListObj | DictObj):
+            steps[cls_field.name] = step
+    return steps
+
+
+def drop(elem: ObjectifiedElement):
+    """Drop an element (at its end event) from the tree being streamed"""
+    elem.clear()
+    elem.getparent().remove(elem)  # type: ignore[union-attr]
+
+
+def parse_part(
+    cls: type,
+    file_path: str | Path,
+    compression: Compression,
+    opts: XOptions,
+    part: int,
+    parts: int,
+    chunk_size: int,
+) -> dict[str, list[tuple[int, list[Any]]]]:
+    """
+    Parse the chunks of items in part (run in a worker process), returning
+    the (index, items) of each chunk, for each list/dictionary member present
+    - Items of other parts, and the other members, are dropped as they are
+      streamed, and the items of a chunk once it is parsed
+    """
+    by_tag = {
+        step.tag: (member, step)
+        for member, step in container_steps(cls).items()
+    }
+    parsed: dict[str, list[tuple[int, list[Any]]]] = {}
+
+    with using_options(**asdict(opts)):
+        ctx = XErrorCtx([typename(cls)])
+        # the member being streamed (if a list/dictionary), the number of its
+        # items seen, and the items kept for the current chunk
+        # NOTE: items are tracked from their end events, as the parser reads
+        #       ahead (so the member's element can hold unfinished items)
+        member: str | None = None
+        step: XStep | None = None
+        index = 0
+        kept: list[ObjectifiedElement] = []
+
+        def parse_kept():
+            assert member is not None and step is not None
+            offset = (index - 1) // chunk_size * chunk_size
+            if isinstance(step.xobject, ListObj):
+                vals = step.xobject.xml_in_items(
+                    kept, ctx.next(step.name), offset
+                )
+            else:
+                assert isinstance(step.xobject, DictObj)
+                vals = step.xobject.xml_in_items(
+                    kept, ctx.next(step.name), step.tag
+                )
+            parsed[member].append((offset // chunk_size, vals))
+            for item in kept:
+                drop(item)
+            kept.clear()
+
+        with open_xml(file_path, "rb", compression) as f:
+            depth = 0
+            for event, elem in objectify_events(f):
+                if event == "start":
+                    depth += 1
+                    if depth == 1:
+                        ctx = XErrorCtx([elem.tag])
+                    elif depth == 2:
+                        member, step = by_tag.get(elem.tag, (None, None))
+                        # NOTE: only the first element for a member is parsed
+                        if member is not None and member in parsed:
+                            member, step = None, None
+                        elif member is not None:
+                            parsed[member] = []
+                            index = 0
+                    continue
+
+                if depth == 3:
+                    if member is None:
+                        drop(elem)
+                    elif index // chunk_size % parts == part:
+                        index += 1
+                        kept.append(elem)
+                        if index % chunk_size == 0:
+                            parse_kept()
+                    else:
+                        index += 1
+                        drop(elem)
+                elif depth == 2:
+                    if len(kept) > 0:
+                        # the last chunk, with fewer items
+                        parse_kept()
+                    member, step = None, None
+                    drop(elem)
+                depth -= 1
+    return parsed
+
+
+def parse_file_parallel(
+    cls: type,
+    file_path: str | Path,
+    workers: int | None = None,
+    chunk_size: int = 10_000,
+    compression: Compression = "infer",
+) -> Any:
+    """
+    Parse a file, parsing the items of the root's list and dictionary members
+    in parallel
+    - Items are parsed in chunks of chunk_size by workers (processes), while
+      the parent parses the other members
+    - workers defaults to the number of cpus, with fewer than 2 the file is
+      parsed serially
+    - The current options (e.g. huge_tree and limits) apply to the workers
+    - Errors in chunks are reported with the index of the item in the member
+    INV: cls must be an @xmlify class, importable by worker processes (not a
+         local class)
+    """
+    if not is_xmlified(cls):
+        raise ErrorTypes.NotXmlified(cls)
+    elif not hasattr(cls, "parse_only"):
+        raise ErrorTypes.NotProjectable(cls)
+
+    steps = container_steps(cls)
+    pool_size: int = some_or(workers, os.cpu_count() or 1)
+    if len(steps) == 0 or pool_size < 2:
+        return parse_file(cls, file_path, compression=compression)
+
+    xobject = cls.get_xobject()  # type: ignore[attr-defined]
+    ctx = XErrorCtx([typename(cls)])
+    others = {
+        xobject.xml_step(f.name, ctx).tag
+        for f in fields(cls)
+        if f.name not in steps
+    }
+
+    opts = options()
+    with ProcessPoolExecutor(pool_size) as pool:
+        parts: list[Future[dict[str, list[tuple[int, list[Any]]]]]] = [
+            pool.submit(
+                parse_part,
+                cls,
+                file_path,
+                compression,
+                opts,
+                part,
+                pool_size,
+                chunk_size,
+            )
+            for part in range(pool_size)
+        ]
+
+        # the items of the lists and dictionaries are dropped, so they parse
+        # as empty (and missing members get their default, or are reported,
+        # as when parsed serially)
+        root = parse_selected(file_path, others, compression)
+        ctx = XErrorCtx([root.tag])
+        members: dict[str, Any] = xobject.xml_in_members(root, ctx, None)
+        del root
+
+        chunks: dict[str, list[tuple[int, list[Any]]]] = {}
+        for future in parts:
+            for member, member_chunks in future.result().items():
+                chunks.setdefault(member, []).extend(member_chunks)
+
+    for member, member_chunks in chunks.items():
+        step = steps[member]
+        results = chain.from_iterable(
+            vals for _, vals in sorted(member_chunks, key=lambda c: c[0])
+        )
+        if isinstance(step.xobject, ListObj):
+            members[member] = list(results)
+        else:
+            assert isinstance(step.xobject, DictObj)
+            members[member] = step.xobject.from_items(
+                results, ctx.next(step.name), step.tag
+            )
+    return xobject.from_members(members)
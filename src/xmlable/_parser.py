@@ -0,0 +1,122 @@
+"""
+Parsing xml
+- Elements are objectified, with comments and blank text dropped by libxml2
+- Only internal entities (declared in the document) are resolved, and no
+  DTDs or network resources are loaded, so untrusted documents cannot read
+  files or make requests (external entities fail to parse, rather than being
+  silently dropped)
+- Each thread reuses its own parser (lxml parsers cannot be shared between
+  threads)
+- Limits on depth, elements and text (see XOptions) are checked as the
+  document is read, so oversized documents fail before being held whole
+"""
+
+import threading
+from io import BytesIO
+from typing import IO, Any, Iterable, Iterator, cast
+from lxml.etree import XMLParser, iterparse
+from lxml.objectify import (
+    ObjectifiedElement,
+    ObjectifyElementClassLookup,
+    makeparser,
+    parse as objectify_parse,
+    fromstring as objectify_fromstring,
+)
+
+from xmlable._errors import ErrorTypes
+from xmlable._options import XOptions, options
+
+PARSER_OPTIONS: dict[str, Any] = {
+    "remove_comments": True,
+    "remove_blank_text": True,
+    "resolve_entities": "internal",
+    "load_dtd": False,
+    "no_network": True,
+}
+
+THREAD_PARSERS = threading.local()
+
+
+def thread_parser(huge_tree: bool) -> XMLParser:
+    """The current thread's parser"""
+    parsers: dict[bool, XMLParser] = THREAD_PARSERS.__dict__.setdefault(
+        "parsers", {}
+    )
+    if (parser := parsers.get(huge_tree)) is None:
+        parser = makeparser(huge_tree=huge_tree, **PARSER_OPTIONS)
+        parsers[huge_tree] = parser
+    return parser
+
+
+def is_limited(opts: XOptions) -> bool:
+    return (
+        opts.max_depth is not None
+        or opts.max_elements is not None
+        or opts.max_text is not None
+    )
+
+
+def limited(
+    events: Iterable[tuple[str, ObjectifiedElement]], opts: XOptions
+) -> Iterator[tuple[str, ObjectifiedElement]]:
+    """Check the limits on the (start/end) events as they are parsed"""
+    depth = 0
+    elements = 0
+    for event, elem in events:
+        if event == "start":
+            depth += 1
+            elements += 1
+            if opts.max_depth is not None and depth > opts.max_depth:
+                raise ErrorTypes.ParseLimit("depth", opts.max_depth, elem.tag)
+            if opts.max_elements is not None and elements > opts.max_elements:
+                raise ErrorTypes.ParseLimit(
+                    "elements", opts.max_elements, elem.tag
+                )
+        else:
+            depth -= 1
+            if (
+                opts.max_text is not None
+                and elem.text is not None
+                and len(elem.text) > opts.max_text
+            ):
+                raise ErrorTypes.ParseLimit("text", opts.max_text, elem.tag)
+        yield event, elem
+
+
+def objectify_events(f: IO[bytes]) -> Iterator[tuple[str, ObjectifiedElement]]:
+    """
+    Stream (event, element) pairs for the start and end of each element
+    - Elements are objectified (as with objectify's parse)
+    - The root is the element of the first event
+    """
+    opts = options()
+    events = iterparse(
+        f,
+        events=("start", "end"),
+        huge_tree=opts.huge_tree,
+        **PARSER_OPTIONS,
+    )
+    events.set_element_class_lookup(ObjectifyElementClassLookup())
+    return limited(events, opts) if is_limited(opts) else events
+
+
+def parse_xml(f: IO[bytes]) -> ObjectifiedElement:
+    """Parse the root element of a document"""
+    opts = options()
+    if not is_limited(opts):
+        tree = objectify_parse(f, thread_parser(opts.huge_tree))
+        return cast(ObjectifiedElement, tree.getroot())
+    root = None
+    for _, elem in objectify_events(f):
+        if root is None:
+            root = elem
+    assert root is not None, "iterparse raises for empty documents"
+    return root
+
+
+def parse_xml_bytes(data: bytes | str) -> ObjectifiedElement:
+    """Parse the root element of a document in memory"""
+    opts = options()
+    if not is_limited(opts):
+        return objectify_fromstring(data, thread_parser(opts.huge_tree))
+    return parse_xml(BytesIO(data.encode() if isinstance(data, str) else data))
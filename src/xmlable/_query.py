@@ -0,0 +1,171 @@
+"""
+Queries for single values in a file
+- Streams the file, keeping only the elements on the path to the value
+- Parses only the value found
+"""
+
+from pathlib import Path
+from typing import IO, Any, Iterable, cast
+from lxml.objectify import ObjectifiedElement
+
+from xmlable._utils import typename
+from xmlable._errors import XErrorCtx, ErrorTypes
+from xmlable._xobject import XStep, is_xmlified
+from xmlable._parser import objectify_events
+from xmlable._compression import open_xml, Compression
+
+
+def drop(elem: ObjectifiedElement):
+    elem.clear()
+    if (parent := elem.getparent()) is not None:
+        parent.remove(elem)
+
+
+def find_in(
+    elem: ObjectifiedElement, steps: list[XStep], ctxs: list[XErrorCtx]
+) -> ObjectifiedElement:
+    """Select the element from a complete elem"""
+    for step, ctx in zip(steps, ctxs):
+        for i, child in enumerate(elem.iterchildren(step.tag)):
+            child = cast(ObjectifiedElement, child)
+            if step.match(child, i):
+                break
+        else:
+            raise ErrorTypes.QueryNotFound(ctx, elem.tag)
+        if step.inner is None:
+            elem = child
+        elif (inner := child.find(step.inner)) is not None:
+            elem = cast(ObjectifiedElement, inner)
+        else:
+            raise ErrorTypes.QueryNotFound(ctx, child.tag)
+    return elem
+
+
+def find_subtree(
+    f: IO[bytes], steps: list[XStep], ctxs: list[XErrorCtx]
+) -> ObjectifiedElement:
+    """
+    Stream elements from f, returning the element selected by the steps
+    - Subtrees that cannot contain the selected element are dropped as they
+      are parsed
+    """
+    # the element whose children are candidates for steps[matched]
+    container: ObjectifiedElement | None = None
+    matched = 0
+    candidates = 0
+
+    # a candidate that cannot be matched until more of it is parsed
+    pending: ObjectifiedElement | None = None
+    pending_index = 0
+
+    # a selected element, waiting for its child (steps' inner) with the value
+    awaiting: ObjectifiedElement | None = None
+
+    # the depth of the subtree being dropped
+    depth = 0
+    drop_depth: int | None = None
+
+    for event, elem in objectify_events(f):
+        if event == "start":
+            depth += 1
+            if drop_depth is not None:
+                continue
+            elif container is None:
+                container = elem
+            elif awaiting is not None and elem.getparent() is awaiting:
+                if elem.tag == steps[matched - 1].inner:
+                    container, awaiting = elem, None
+            elif matched < len(steps) and elem.getparent() is container:
+                step = steps[matched]
+                if elem.tag != step.tag:
+                    drop_depth = depth
+                else:
+                    index = candidates
+                    candidates += 1
+                    match None if step.by_content else step.match(elem, index):
+                        case None:
+                            pending, pending_index = elem, index
+                        case True:
+                            matched += 1
+                            candidates = 0
+                            if step.inner is None:
+                                container = elem
+                            else:
+                                awaiting = elem
+                        case False:
+                            drop_depth = depth
+        else:
+            if drop_depth is not None:
+                if depth <= drop_depth + 1:
+                    drop(elem)
+                if depth == drop_depth:
+                    drop_depth = None
+            elif pending is not None and (
+                elem is pending or elem.getparent() is pending
+            ):
+                step = steps[matched]
+                if step.match(pending, pending_index):
+                    matched += 1
+                    if elem is pending:
+                        # complete, so the remaining steps are in the element
+                        inner = (
+                            pending
+                            if step.inner is None
+                            else pending.find(step.inner)
+                        )
+                        if inner is None:
+                            raise ErrorTypes.QueryNotFound(
+                                ctxs[matched], pending.tag
+                            )
+                        selected = cast(ObjectifiedElement, inner)
+                        return find_in(
+                            selected, steps[matched:], ctxs[matched:]
+                        )
+                    candidates = 0
+                    if step.inner is None:
+                        container = pending
+                    else:
+                        awaiting = pending
+                    pending = None
+                elif elem is pending:
+                    drop(elem)
+                    pending = None
+                else:
+                    drop(elem)
+                    drop_depth = depth - 1
+                    pending = None
+            elif elem is container and matched == len(steps):
+                return container
+            elif elem is container or elem is awaiting:
+                raise ErrorTypes.QueryNotFound(ctxs[matched], elem.tag)
+            depth -= 1
+    raise ErrorTypes.QueryNotFound(ctxs[matched], "the document")
+
+
+def query_file(
+    cls: type,
+    file_path: str | Path,
+    query: Iterable[Any],
+    compression: Compression = "infer",
+) -> Any:
+    """
+    Parse only the value selected by the query from a file
+    - The query is a path of member names, list/tuple indexes and dictionary
+      keys (e.g. `("named_sessions", "sess_123", "conn")`)
+    INV: cls must be an xmlified class
+    """
+    if not is_xmlified(cls):
+        raise ErrorTypes.NotXmlified(cls)
+
+    xobj = cls.get_xobject()  # type: ignore[attr-defined]
+    ctx = XErrorCtx([typename(cls)])
+    ctxs, steps = [ctx], []
+    for q in query:
+        step = xobj.xml_step(q, ctx)
+        ctx = ctx.next(step.name)
+        xobj = step.xobject
+        ctxs.append(ctx)
+        steps.append(step)
+
+    with open_xml(file_path, "rb", compression) as f:
+        return xobj.xml_in(find_subtree(f, steps, ctxs), ctx)
@@ -0,0 +1,115 @@
+"""
+State while generating a schema
+- Set by xsd() for the duration of generating a schema, so xobjects can
+  declare shared (named) types once, and reference them by name
+- Namespace prefixes for XMLSchema are resolved once, and declared only on
+  the xs:schema
+- Held in a context variable, so is per thread/task
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+from lxml.etree import _Element
+
+from xmlable._utils import firstkey
+from xmlable._lxml_helpers import XMLURL
+
+
+@dataclass
+class XSchema:
+    """
+    The schema being generated
+    - Named types are prefixed (e.g. by module for schemas split across files)
+    """
+
+    # the prefix declared for XMLSchema on the xs:schema
+    xs_prefix: str
+    prefix: str = ""
+
+    # named complexTypes in declaration order (each after the types it uses)
+    types: list[_Element] = field(default_factory=list)
+
+    # (readable name, xml signature) to the declared name
+    names: dict[tuple[str, str], str] = field(default_factory=dict)
+
+    def declare(
+        self, name: str, signature: str, complex_type: Callable[[], _Element]
+    ) -> str:
+        """
+        Get the name of the type, declaring it if not already declared
+        - Different types with the same readable name are given suffixes
+        """
+        if (declared := self.names.get((name, signature))) is not None:
+            return declared
+
+        taken = set(self.names.values())
+        unique = self.prefix + name
+        suffix = 2
+        while unique in taken:
+            unique = f"{self.prefix}{name}_{suffix}"
+            suffix += 1
+
+        self.names[(name, signature)] = unique
+        declaration = complex_type()
+        declaration.set("name", unique)
+        self.types.append(declaration)
+        return unique
+
+
+SCHEMA: ContextVar[XSchema | None] = ContextVar("xmlable_schema", default=None)
+
+
+def schema_state() -> XSchema | None:
+    return SCHEMA.get()
+
+
+def resolve_prefix(namespaces: dict[str, str], url: str, preferred: str) -> str:
+    """
+    Get the prefix for url, adding it to namespaces if not present
+    - Conflicts are resolved by extending the preferred prefix (xs -> xss)
+    """
+    if (prefix := firstkey(namespaces, url)) is not None:
+        return prefix
+    prefix = preferred
+    while prefix in namespaces:
+        prefix += preferred[-1]
+    namespaces[prefix] = url
+    return prefix
+
+
+@contextmanager
+def generating_schema(
+    namespaces: dict[str, str], prefix: str = ""
+) -> Iterator[XSchema]:
+    """
+    Generate a schema within the with block
+    - The XMLSchema prefix is added to namespaces (to declare on xs:schema)
+    """
+    schema = XSchema(resolve_prefix(namespaces, XMLURL, "xs"), prefix)
+    token = SCHEMA.set(schema)
+    try:
+        yield schema
+    finally:
+        SCHEMA.reset(token)
+
+
+def xs_qualified(
+    type_str: str, add_ns: dict[str, str] | None
+) -> tuple[str, dict[str, str] | None]:
+    """
+    Qualify an XMLSchema type (e.g. "integer" -> "xs:integer") for use in an
+    attribute (which lxml does not qualify), with the nsmap for the element
+    - Within xsd(), the schema's prefix is used, so no nsmap is needed
+    - Otherwise the prefix is taken from add_ns, or declared on the element
+    """
+    if (schema := schema_state()) is not None:
+        return f"{schema.xs_prefix}:{type_str}", None
+    elif (
+        add_ns is not None and (prefix := firstkey(add_ns, XMLURL)) is not None
+    ):
+        return f"{prefix}:{type_str}", None
+    else:
+        prefix = resolve_prefix(dict(add_ns or {}), XMLURL, "xs")
+        return f"{prefix}:{type_str}", {prefix: XMLURL}
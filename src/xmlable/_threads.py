@@ -0,0 +1,26 @@
+"""
+Generating and parsing from many threads
+- Generation and parsing keep all state per call (options and schema state
+  are context variables, xobjects are not changed after creation), so can run
+  concurrently
+- lxml releases the GIL while serializing and parsing, so threads help for
+  many small documents without the cost of processes
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+def run_concurrently(
+    jobs: Iterable[Callable[[], T]], workers: int | None = None
+) -> list[T]:
+    """
+    Run jobs in a thread pool, returning their results in order
+    - e.g. `run_concurrently(lambda p=p, v=v: write_xml_value(p, v) for p, v in files)`
+    - The first error raised by a job is raised (after all jobs finish)
+    """
+    with ThreadPoolExecutor(workers) as pool:
+        futures = [pool.submit(job) for job in jobs]
+    return [future.result() for future in futures]
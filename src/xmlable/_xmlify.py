@@ -10,16 +10,55 @@ Given a dataclass:
 """
 
 from humps import pascalize
-from dataclasses import fields, is_dataclass
-from typing import Any, dataclass_transform, cast
+from functools import cache
+from hashlib import sha256
+from dataclasses import fields, is_dataclass, Field, MISSING
+from typing import Any, Iterable, dataclass_transform, cast
 from lxml.objectify import ObjectifiedElement
 from lxml.etree import Element, _Element
 
-from xmlable._utils import get, typename, AnyType
+from xmlable._utils import get, opt_get, typename, AnyType
 from xmlable._errors import XError, XErrorCtx, ErrorTypes
 from xmlable._manual import manual_xmlify
 from xmlable._lxml_helpers import with_children, with_child, XMLSchema
-from xmlable._xobject import XObject, gen_xobject
+from xmlable._xobject import XObject, XStep, gen_xobject, first, nth_child
+from xmlable._digest import XParsed, Digests
+from xmlable._options import options
+
+
+class Unparsed:
+    """
+    The value given to fields skipped by a projected parse (see
+    `parse_file(..., only=...)`) that have no dataclass default
+    """
+
+    def __repr__(self) -> str:
+        return "UNPARSED"
+
+
+UNPARSED = Unparsed()
+
+
+def field_default(f: Field) -> Any:
+    if f.default is not MISSING:
+        return f.default
+    elif f.default_factory is not MISSING:
+        return f.default_factory()
+    else:
+        return UNPARSED
+
+
+def can_omit(f: Field) -> bool:
+    """
+    If the member can be missing from the xml
+    - init=False members are set by the class (e.g. in __post_init__), so are
+      never parsed into the value
+    """
+    return (
+        not f.init
+        or f.default is not MISSING
+        or f.default_factory is not MISSING
+    )
 
 
 def validate_class(cls: AnyType):
@@ -67,12 +106,18 @@ def xmlify(cls: type) -> AnyType:
             for f in fields(cls)
         ]
 
+        # JUSTIFY: Defaults are compared with when writing sparse xml, so are
+        #          created once (rather than calling default factories for
+        #          every value written)
+        member_defaults = [field_default(m) for _, m, _ in meta_xobjects]
+        init_names = {m.name for _, m, _ in meta_xobjects if m.init}
+
         class UserXObject(XObject):
             def xsd_out(
                 self,
                 name: str,
-                attribs: dict[str, str] = {},
-                add_ns: dict[str, str] = {},
+                attribs: dict[str, str] | None = None,
+                add_ns: dict[str, str] | None = None,
             ) -> _Element:
                 return Element(
                     f"{XMLSchema}element",
@@ -91,31 +136,194 @@ def xmlify(cls: type) -> AnyType:
                 )
 
             def xml_out(self, name: str, val: Any, ctx: XErrorCtx) -> _Element:
-                return with_children(
-                    Element(name),
-                    [
-                        xobj.xml_out(
-                            pascal_name,
-                            get(val, m.name),
-                            ctx.next(pascal_name),
-                        )
-                        for pascal_name, m, xobj in meta_xobjects
-                    ],
-                )
+                elem = Element(name)
+                sparse = options().sparse
+                for (pascal_name, m, xobj), default in zip(
+                    meta_xobjects, member_defaults
+                ):
+                    m_val = get(val, m.name)
+                    # NOTE: values of the wrong type (e.g. 1 for 1.0) are never
+                    #       skipped, so are still rejected by xml_out
+                    if (
+                        sparse
+                        and default is not UNPARSED
+                        and type(m_val) is type(default)
+                        and m_val == default
+                    ):
+                        continue
+                    elem.append(
+                        xobj.xml_out(pascal_name, m_val, ctx.next(pascal_name))
+                    )
+                return elem
 
             def xml_in(self, obj: ObjectifiedElement, ctx: XErrorCtx) -> Any:
+                return self.xml_in_only(obj, ctx, None)
+
+            def xml_in_only(
+                self,
+                obj: ObjectifiedElement,
+                ctx: XErrorCtx,
+                only: set[str] | None,
+            ) -> Any:
+                """
+                Parse only the members with tags in only (all if None), the
+                rest are set to their default (or UNPARSED)
+                """
+                parsed = self.xml_in_members(obj, ctx, only)
+                for _, m, _ in meta_xobjects:
+                    if m.name not in parsed:
+                        parsed[m.name] = field_default(m)
+                return self.from_members(parsed)
+
+            def xml_in_members(
+                self,
+                obj: ObjectifiedElement,
+                ctx: XErrorCtx,
+                only: set[str] | None,
+            ) -> dict[str, Any]:
+                """
+                Parse the values of the members with tags in only (all if
+                None), by member name
+                """
                 parsed: dict[str, Any] = {}
                 for pascal_name, m, xobj in meta_xobjects:
-                    if (m_obj := get(obj, pascal_name)) is not None:
+                    if only is not None and pascal_name not in only:
+                        continue
+                    elif (m_obj := opt_get(obj, pascal_name)) is not None:
                         parsed[m.name] = xobj.xml_in(
                             m_obj, ctx.next(pascal_name)
                         )
+                    elif can_omit(m):
+                        parsed[m.name] = field_default(m)
                     else:
                         raise ErrorTypes.NonMemberTag(ctx, cls, obj.tag, m.name)
-                return cls(**parsed)
+                return parsed
+
+            def from_members(self, members: dict[str, Any]) -> Any:
+                """
+                Construct a value from the values of its members (by name),
+                init=False members are left to the class
+                """
+                return cls(
+                    **{k: v for k, v in members.items() if k in init_names}
+                )
+
+            def xml_in_reuse(
+                self,
+                obj: ObjectifiedElement,
+                ctx: XErrorCtx,
+                prev: XParsed | None,
+                digests: Digests,
+            ) -> XParsed:
+                digest = digests[obj]
+                if prev is not None and prev.digest == digest:
+                    return prev
+
+                members = []
+                for i, (pascal_name, m, xobj) in enumerate(meta_xobjects):
+                    if (m_obj := opt_get(obj, pascal_name)) is not None:
+                        members.append(
+                            xobj.xml_in_reuse(
+                                m_obj,
+                                ctx.next(pascal_name),
+                                nth_child(prev, i),
+                                digests,
+                            )
+                        )
+                    elif can_omit(m):
+                        # NOTE: kept in place so members stay in field order
+                        members.append(XParsed(b"", field_default(m)))
+                    else:
+                        raise ErrorTypes.NonMemberTag(ctx, cls, obj.tag, m.name)
+                return XParsed(
+                    digest,
+                    self.from_members(
+                        {
+                            m.name: parsed.val
+                            for (_, m, _), parsed in zip(meta_xobjects, members)
+                        }
+                    ),
+                    members,
+                )
+
+            def bin_out(self, val: Any, ctx: XErrorCtx, out: bytearray):
+                for pascal_name, m, xobj in meta_xobjects:
+                    xobj.bin_out(get(val, m.name), ctx.next(pascal_name), out)
+
+            def bin_in(
+                self, buf: memoryview, pos: int, ctx: XErrorCtx
+            ) -> tuple[Any, int]:
+                parsed: dict[str, Any] = {}
+                for pascal_name, m, xobj in meta_xobjects:
+                    parsed[m.name], pos = xobj.bin_in(
+                        buf, pos, ctx.next(pascal_name)
+                    )
+                return self.from_members(parsed), pos
+
+            def plain_out(self, val: Any, ctx: XErrorCtx) -> dict[str, Any]:
+                return {
+                    m.name: xobj.plain_out(
+                        get(val, m.name), ctx.next(pascal_name)
+                    )
+                    for pascal_name, m, xobj in meta_xobjects
+                }
+
+            def plain_in(self, obj: Any, ctx: XErrorCtx) -> Any:
+                if type(obj) != dict:
+                    raise ErrorTypes.InvalidPlain(ctx, obj, cls_name)
+                parsed: dict[str, Any] = {}
+                for pascal_name, m, xobj in meta_xobjects:
+                    if m.name in obj:
+                        parsed[m.name] = xobj.plain_in(
+                            obj[m.name], ctx.next(pascal_name)
+                        )
+                    elif can_omit(m):
+                        parsed[m.name] = field_default(m)
+                    else:
+                        raise ErrorTypes.NonMemberTag(
+                            ctx, cls, cls_name, m.name
+                        )
+                return self.from_members(parsed)
+
+            def xsd_type_name(self) -> str | None:
+                return cls_name
+
+            def xml_check(
+                self,
+                obj: ObjectifiedElement,
+                ctx: XErrorCtx,
+                errors: list[XError],
+            ):
+                for pascal_name, m, xobj in meta_xobjects:
+                    if (m_obj := opt_get(obj, pascal_name)) is not None:
+                        xobj.xml_check(m_obj, ctx.next(pascal_name), errors)
+                    elif not can_omit(m):
+                        errors.append(
+                            ErrorTypes.NonMemberTag(ctx, cls, obj.tag, m.name)
+                        )
+
+            def xml_signature(self) -> str:
+                return f"{cls_name}#{members_signature()}"
+
+            def xml_step(self, step: Any, ctx: XErrorCtx) -> XStep:
+                tag = pascalize(step) if type(step) == str else None
+                for pascal_name, _, xobj in meta_xobjects:
+                    if pascal_name == tag:
+                        return XStep(pascal_name, pascal_name, first, xobj)
+                raise ErrorTypes.InvalidQueryStep(ctx, step, cls_name)
 
         cls_xobject = UserXObject()
 
+        @cache
+        def members_signature() -> str:
+            # NOTE: hashed so the signatures of classes using this one do not
+            #       grow with the size of this class
+            members = ";".join(
+                f"{m.name}:{pascal_name}:{xobj.xml_signature()}"
+                for pascal_name, m, xobj in meta_xobjects
+            )
+            return sha256(members.encode()).hexdigest()
+
         # JUSTIFY: Why are xsd forward & dependencies not part of xobject?
         #          - xobject covers the use (not forward decs)
         #          - we want to present error messages to the user containing
@@ -130,7 +338,12 @@ def xmlify(cls: type) -> AnyType:
                 with_children(
                     Element(f"{XMLSchema}sequence"),
                     [
-                        xobj.xsd_out(pascal_name, attribs={}, add_ns=add_ns)
+                        xobj.xsd_out(
+                            pascal_name,
+                            # members with defaults can be omitted (see sparse)
+                            attribs=({"minOccurs": "0"} if can_omit(m) else {}),
+                            add_ns=add_ns,
+                        )
                         for pascal_name, m, xobj in meta_xobjects
                     ],
                 ),
@@ -142,11 +355,27 @@ def xmlify(cls: type) -> AnyType:
         def get_xobject():
             return cls_xobject
 
+        @cache
+        def xml_fingerprint() -> str:
+            return sha256(cls_xobject.xml_signature().encode()).hexdigest()
+
+        member_tags = [pascal_name for pascal_name, _, _ in meta_xobjects]
+
+        def parse_only(obj: ObjectifiedElement, only: Iterable[str]) -> Any:
+            # only can contain field names, or their tags
+            tags = {pascalize(name) for name in only}
+            for tag in tags:
+                if tag not in member_tags:
+                    raise ErrorTypes.UnknownMember(cls, tag, member_tags)
+            return cls_xobject.xml_in_only(obj, XErrorCtx([obj.tag]), tags)
+
         # helper methods for gen_xobject, and other dataclasses to generate their
         # x methods
         cls.xsd_forward = xsd_forward  # type: ignore[attr-defined]
         cls.xsd_dependencies = xsd_dependencies  # type: ignore[attr-defined]
         cls.get_xobject = get_xobject  # type: ignore[attr-defined]
+        cls.parse_only = parse_only  # type: ignore[attr-defined]
+        cls.xml_fingerprint = xml_fingerprint  # type: ignore[attr-defined]
 
         return manual_xmlify(cls)
     except XError as e:
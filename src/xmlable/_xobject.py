@@ -4,25 +4,61 @@ XObjects are an intermediate representation for python types -> xsd/xml
 - Associated xsd, xml and parsing
 """
 
+import sys
 from humps import pascalize
+from array import array
 from dataclasses import dataclass
+from functools import cached_property
 from types import NoneType, UnionType
 from lxml.objectify import ObjectifiedElement
-from lxml.etree import Element, Comment, _Element
+from lxml.etree import Element, Comment, _Element, tostring
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Type, get_args, TypeAlias, cast
+from typing import (
+    Any,
+    Annotated,
+    Callable,
+    Iterable,
+    Type,
+    get_args,
+    get_origin,
+    TypeAlias,
+    Union,
+    cast,
+)
 from types import GenericAlias
 
-from xmlable._utils import get, typename, firstkey, AnyType
-from xmlable._errors import XErrorCtx, ErrorTypes
+from xmlable._utils import get, opt_get, typename, AnyType
+from xmlable._errors import XError, XErrorCtx, ErrorTypes
+from xmlable._digest import XParsed, Digests
+from xmlable._parser import parse_xml_bytes
+from xmlable._binary import (
+    BASIC_CODECS,
+    write_uvarint,
+    read_uvarint,
+    write_bytes,
+    read_bytes,
+    write_bool,
+    read_bool,
+)
 from xmlable._lxml_helpers import (
     with_text,
     with_child,
     with_children,
     XMLSchema,
-    XMLURL,
     children,
+    canonical_bytes,
+    sorted_children,
+    XSINil,
+    nil_element,
+    resolve_nils,
 )
+from xmlable._options import options
+from xmlable._schema import schema_state, xs_qualified
+
+try:
+    import numpy  # type: ignore[import-not-found]
+except ImportError:  # numpy is optional, only needed for numpy array members
+    numpy = None
 
 
 class XObject(ABC):
@@ -34,8 +70,8 @@ class XObject(ABC):
     def xsd_out(
         self,
         name: str,
-        attribs: dict[str, str] = {},
-        add_ns: dict[str, str] = {},
+        attribs: dict[str, str] | None = None,
+        add_ns: dict[str, str] | None = None,
     ) -> _Element:
         """Generate the xsd schema for the object"""
         pass
@@ -57,6 +93,167 @@ class XObject(ABC):
     def xml_in(self, obj: ObjectifiedElement, ctx: XErrorCtx) -> Any:
         pass
 
+    def xml_signature(self) -> str:
+        """
+        Describes the xml representation, if two objects have the same
+        signature, they have the same xml representation
+        - Must be stable across processes and python versions
+        """
+        return tostring(
+            self.xsd_out("Signature", {}, {}), method="c14n"
+        ).decode()
+
+    def xml_step(self, step: Any, ctx: XErrorCtx) -> "XStep":
+        """
+        Select part of the object's value (e.g. a list index, dictionary key)
+        for queries
+        """
+        raise ErrorTypes.InvalidQueryStep(ctx, step, type(self).__name__)
+
+    def xml_in_reuse(
+        self,
+        obj: ObjectifiedElement,
+        ctx: XErrorCtx,
+        prev: XParsed | None,
+        digests: Digests,
+    ) -> XParsed:
+        """
+        Parse, reusing the previously parsed value if the element is unchanged
+        - Containers override this to reuse the values of unchanged children
+        """
+        digest = digests[obj]
+        if prev is not None and prev.digest == digest:
+            return prev
+        return XParsed(digest, self.xml_in(obj, ctx))
+
+    def bin_out(self, val: Any, ctx: XErrorCtx, out: bytearray):
+        """
+        Append the binary encoding of val to out
+        - By default the xml for val is embedded
+        """
+        write_bytes(
+            out, tostring(resolve_nils(self.xml_out("Value", val, ctx)))
+        )
+
+    def bin_in(
+        self, buf: memoryview, pos: int, ctx: XErrorCtx
+    ) -> tuple[Any, int]:
+        """Decode a value at pos, returning it and the position after it"""
+        data, pos = read_bytes(buf, pos)
+        return self.xml_in(parse_xml_bytes(data), ctx), pos
+
+    def plain_out(self, val: Any, ctx: XErrorCtx) -> Any:
+        """
+        Convert val to plain python data (dicts, lists, and basic types), that
+        can be dumped to json
+        - By default the xml for val is used
+        """
+        return tostring(resolve_nils(self.xml_out("Value", val, ctx))).decode()
+
+    def plain_in(self, obj: Any, ctx: XErrorCtx) -> Any:
+        """Convert plain python data from plain_out back to a value"""
+        if type(obj) != str:
+            raise ErrorTypes.InvalidPlain(ctx, obj, "xml string")
+        return self.xml_in(parse_xml_bytes(obj), ctx)
+
+    def xsd_type_name(self) -> str | None:
+        """
+        A readable name for the xsd type, used to declare it once in a schema
+        - None if the type cannot be named (so is declared inline at each use)
+        """
+        return None
+
+    def xml_check(
+        self, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+    ):
+        """
+        Check obj can be parsed, adding all errors found to errors
+        - Does not build the value (so no user classes are instantiated)
+        - By default the value is parsed, stopping at the first error
+        """
+        try:
+            self.xml_in(obj, ctx)
+        except XError as e:
+            errors.append(e)
+
+
+@dataclass
+class XStep:
+    """
+    A step of a query, selecting a child element of the current element
+    - Only children with the tag are candidates
+    - match checks a candidate given its index among candidates, it can return
+      None if the candidate is not complete enough to decide (it is checked
+      again as each of its children are completed)
+    - If by_content, match reads the candidate's children, so is only checked
+      as each child is completed (at the start of a candidate, its children
+      may be missing or partially parsed)
+    - The value is in the selected child, or its child with the inner tag
+    """
+
+    name: str
+    tag: str
+    match: Callable[[ObjectifiedElement, int], bool | None]
+    xobject: XObject
+    inner: str | None = None
+    by_content: bool = False
+
+
+def reuse_pool(prev: XParsed | None) -> dict[bytes, list[XParsed]]:
+    """The previous children by digest, to reuse children that have moved"""
+    pool: dict[bytes, list[XParsed]] = {}
+    if prev is not None:
+        for child in reversed(prev.children):
+            pool.setdefault(child.digest, []).append(child)
+    return pool
+
+
+def nth_child(prev: XParsed | None, index: int) -> XParsed | None:
+    if prev is not None and index < len(prev.children):
+        return prev.children[index]
+    return None
+
+
+def nth(index: int) -> Callable[[ObjectifiedElement, int], bool | None]:
+    return lambda _, i: i == index
+
+
+def first(_: ObjectifiedElement, i: int) -> bool | None:
+    return i == 0
+
+
+def comment(text: str) -> list[_Element]:
+    """An informational comment for xml and xsd output (omitted if disabled)"""
+    return [Comment(text)] if options().comments else []
+
+
+def xsd_complex(
+    xobj: XObject,
+    name: str,
+    attribs: dict[str, str] | None,
+    complex_type: Callable[[], _Element],
+) -> _Element:
+    """
+    An element of a complex type
+    - When generating a schema with xsd(), nameable types are declared once
+      and referenced by name
+    - Otherwise the complexType is anonymous and inline
+    """
+    if (schema := schema_state()) is not None and (
+        type_name := xobj.xsd_type_name()
+    ) is not None:
+        return Element(
+            f"{XMLSchema}element",
+            name=name,
+            type=schema.declare(type_name, xobj.xml_signature(), complex_type),
+            attrib=attribs,
+        )
+    else:
+        return with_child(
+            Element(f"{XMLSchema}element", name=name, attrib=attribs),
+            complex_type(),
+        )
+
 
 @dataclass
 class BasicObj(XObject):
@@ -72,33 +269,21 @@ class BasicObj(XObject):
     def xsd_out(
         self,
         name: str,
-        attribs: dict[str, Any] = {},
-        add_ns: dict[str, str] = {},
+        attribs: dict[str, Any] | None = None,
+        add_ns: dict[str, str] | None = None,
     ) -> _Element:
         # NOTE: namespace cringe:
         #       - lxml will deal with qualifying namespaces for the name of the
         #         element, but not for attributes
         #       - XMLSchema type attributes must be qualified
-        if (prefix := firstkey(add_ns, XMLURL)) is not None:
-            return Element(
-                f"{XMLSchema}element",
-                name=name,
-                type=f"{prefix}:{self.type_str}",
-                attrib=attribs,
-            )
-        else:
-            # add new namespace, resolve conflicts with extra 's'
-            new_ns = "xs"
-            while new_ns in add_ns:
-                new_ns += "s"
-            add_ns[new_ns] = XMLURL
-            return Element(
-                f"{XMLSchema}element",
-                name=name,
-                type=f"{new_ns}:{self.type_str}",
-                attrib=attribs,
-                nsmap={new_ns: XMLURL},
-            )
+        type_name, nsmap = xs_qualified(self.type_str, add_ns)
+        return Element(
+            f"{XMLSchema}element",
+            name=name,
+            type=type_name,
+            attrib=attribs,
+            nsmap=nsmap,
+        )
 
     def xml_temp(self, name: str) -> _Element:
         return with_text(Element(name), f"Fill me with an {self.type_str}")
@@ -114,6 +299,68 @@ class BasicObj(XObject):
         except Exception as e:
             raise ErrorTypes.ParseFailure(ctx, obj.text, self.type_str, e)
 
+    def xml_signature(self) -> str:
+        return self.type_str
+
+    def bin_out(self, val: Any, ctx: XErrorCtx, out: bytearray):
+        if (codec := BASIC_CODECS.get(self.type_str)) is None:
+            return super().bin_out(val, ctx, out)
+        if not self.validate_fn(val):
+            raise ErrorTypes.InvalidData(ctx, val, self.type_str)
+        codec[0](out, val)
+
+    def bin_in(
+        self, buf: memoryview, pos: int, ctx: XErrorCtx
+    ) -> tuple[Any, int]:
+        if (codec := BASIC_CODECS.get(self.type_str)) is None:
+            return super().bin_in(buf, pos, ctx)
+        return codec[1](buf, pos)
+
+    def plain_out(self, val: Any, ctx: XErrorCtx) -> Any:
+        if not self.validate_fn(val):
+            raise ErrorTypes.InvalidData(ctx, val, self.type_str)
+        return val
+
+    def plain_in(self, obj: Any, ctx: XErrorCtx) -> Any:
+        if not self.validate_fn(obj):
+            raise ErrorTypes.InvalidPlain(ctx, obj, self.type_str)
+        return obj
+
+    def xsd_type_name(self) -> str | None:
+        return pascalize(self.type_str)
+
+    def xml_check(
+        self, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+    ):
+        self.check_identity(obj, ctx, errors)
+
+    def check_identity(
+        self, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+    ) -> Any:
+        """Check obj, returning the parsed value to identify duplicates"""
+        try:
+            return self.parse_fn(obj)
+        except Exception as e:
+            errors.append(
+                ErrorTypes.ParseFailure(ctx, obj.text, self.type_str, e)
+            )
+            return None
+
+
+def check_identity(
+    xobj: XObject, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+) -> Any:
+    """
+    Check obj, returning a value identifying it (to find duplicate keys and
+    set items without building values)
+    - Basic values are identified by their value (e.g. "1" and "01")
+    - Others by their canonical xml
+    """
+    if isinstance(xobj, BasicObj):
+        return xobj.check_identity(obj, ctx, errors)
+    xobj.xml_check(obj, ctx, errors)
+    return canonical_bytes(obj)
+
 
 @dataclass
 class ListObj(XObject):
@@ -128,15 +375,17 @@ class ListObj(XObject):
     def xsd_out(
         self,
         name: str,
-        attribs: dict[str, str] = {},
-        add_ns: dict[str, str] = {},
+        attribs: dict[str, str] | None = None,
+        add_ns: dict[str, str] | None = None,
     ) -> _Element:
-        return with_child(
-            Element(f"{XMLSchema}element", name=name, attrib=attribs),
-            with_children(
+        return xsd_complex(
+            self,
+            name,
+            attribs,
+            lambda: with_children(
                 Element(f"{XMLSchema}complexType"),
-                [
-                    Comment(f"This is a {self.struct_name}"),
+                comment(f"This is a {self.struct_name}")
+                + [
                     with_child(
                         Element(f"{XMLSchema}sequence"),
                         self.item_xobject.xsd_out(
@@ -172,13 +421,25 @@ class ListObj(XObject):
                 ],
             )
         else:
-            return with_child(
-                Element(name), Comment(f"Empty {self.struct_name}!")
+            return with_children(
+                Element(name), comment(f"Empty {self.struct_name}!")
             )
 
     def xml_in(self, obj: ObjectifiedElement, ctx: XErrorCtx) -> list[Any]:
+        return self.xml_in_items(children(obj), ctx)
+
+    def xml_in_items(
+        self,
+        items: Iterable[ObjectifiedElement],
+        ctx: XErrorCtx,
+        offset: int = 0,
+    ) -> list[Any]:
+        """
+        Parse items of the list (e.g. a chunk of a large list), indexed from
+        offset
+        """
         parsed = []
-        for i, child in enumerate(children(obj)):
+        for i, child in enumerate(items, offset):
             if child.tag != self.list_elem_name:
                 raise ErrorTypes.UnexpectedTag(
                     ctx, self.list_elem_name, self.struct_name, child.tag
@@ -191,6 +452,145 @@ class ListObj(XObject):
                 )
         return parsed
 
+    def xml_in_reuse(
+        self,
+        obj: ObjectifiedElement,
+        ctx: XErrorCtx,
+        prev: XParsed | None,
+        digests: Digests,
+    ) -> XParsed:
+        digest = digests[obj]
+        if prev is not None and prev.digest == digest:
+            return prev
+
+        # JUSTIFY: Each previous item is reused at most once (whole, or
+        #          partially by a changed item at its index), so items are not
+        #          aliased to the same objects. Whole reuses are found first, so
+        #          a partially reused item is never also reused whole.
+        pool = reuse_pool(prev)
+        items = list(children(obj))
+        reused: list[XParsed | None] = []
+        for child in items:
+            if child.tag != self.list_elem_name:
+                raise ErrorTypes.UnexpectedTag(
+                    ctx, self.list_elem_name, self.struct_name, child.tag
+                )
+            same = pool.get(digests[child])
+            reused.append(same.pop() if same else None)
+        consumed = {id(p) for p in reused if p is not None}
+
+        parsed = []
+        for i, (child, whole) in enumerate(zip(items, reused)):
+            if whole is not None:
+                parsed.append(whole)
+            else:
+                partial = nth_child(prev, i)
+                if partial is not None and id(partial) in consumed:
+                    partial = None
+                parsed.append(
+                    self.item_xobject.xml_in_reuse(
+                        child,
+                        ctx.next(f"{self.list_elem_name}[{i}]"),
+                        partial,
+                        digests,
+                    )
+                )
+        return XParsed(digest, [p.val for p in parsed], parsed)
+
+    def xml_step(self, step: Any, ctx: XErrorCtx) -> XStep:
+        if type(step) != int or step < 0:
+            raise ErrorTypes.InvalidQueryStep(ctx, step, self.struct_name)
+        return XStep(
+            f"{self.list_elem_name}[{step}]",
+            self.list_elem_name,
+            nth(step),
+            self.item_xobject,
+        )
+
+    def xml_signature(self) -> str:
+        return f"{self.struct_name}[{self.list_elem_name}:{self.item_xobject.xml_signature()}]"
+
+    def bin_out(self, val: Any, ctx: XErrorCtx, out: bytearray):
+        write_uvarint(out, len(val))
+        for i, item_val in enumerate(val):
+            self.item_xobject.bin_out(
+                item_val, ctx.next(f"{self.list_elem_name}[{i}]"), out
+            )
+
+    def bin_in(
+        self, buf: memoryview, pos: int, ctx: XErrorCtx
+    ) -> tuple[list[Any], int]:
+        n, pos = read_uvarint(buf, pos)
+        parsed = []
+        for i in range(n):
+            item, pos = self.item_xobject.bin_in(
+                buf, pos, ctx.next(f"{self.list_elem_name}[{i}]")
+            )
+            parsed.append(item)
+        return parsed, pos
+
+    def plain_out(self, val: Any, ctx: XErrorCtx) -> list[Any]:
+        return [
+            self.item_xobject.plain_out(
+                item_val, ctx.next(f"{self.list_elem_name}[{i}]")
+            )
+            for i, item_val in enumerate(val)
+        ]
+
+    def plain_in(self, obj: Any, ctx: XErrorCtx) -> list[Any]:
+        if type(obj) != list:
+            raise ErrorTypes.InvalidPlain(ctx, obj, self.struct_name)
+        return [
+            self.item_xobject.plain_in(
+                item, ctx.next(f"{self.list_elem_name}[{i}]")
+            )
+            for i, item in enumerate(obj)
+        ]
+
+    def xsd_type_name(self) -> str | None:
+        if (item_name := self.item_xobject.xsd_type_name()) is None:
+            return None
+        return f"{pascalize(self.struct_name)}.{item_name}"
+
+    def xml_check(
+        self, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+    ):
+        self.check_items(obj, ctx, errors)
+
+    def check_items(
+        self,
+        obj: ObjectifiedElement,
+        ctx: XErrorCtx,
+        errors: list[XError],
+        identify: bool = False,
+    ) -> list[Any]:
+        """
+        Check the items
+        - If identify, returns their identities (see check_identity)
+        """
+        identities = []
+        for i, child in enumerate(children(obj)):
+            if child.tag != self.list_elem_name:
+                errors.append(
+                    ErrorTypes.UnexpectedTag(
+                        ctx, self.list_elem_name, self.struct_name, child.tag
+                    )
+                )
+            elif identify:
+                identities.append(
+                    check_identity(
+                        self.item_xobject,
+                        child,
+                        ctx.next(f"{self.list_elem_name}[{i}]"),
+                        errors,
+                    )
+                )
+            else:
+                self.item_xobject.xml_check(
+                    child, ctx.next(f"{self.list_elem_name}[{i}]"), errors
+                )
+        return identities
+
 
 @dataclass
 class StructObj(XObject):
@@ -202,16 +602,18 @@ class StructObj(XObject):
     def xsd_out(
         self,
         name: str,
-        attribs: dict[str, str] = {},
-        add_ns: dict[str, str] = {},
+        attribs: dict[str, str] | None = None,
+        add_ns: dict[str, str] | None = None,
     ) -> _Element:
-        return with_child(
-            Element(f"{XMLSchema}element", name=name, attrib=attribs),
-            with_child(
+        return xsd_complex(
+            self,
+            name,
+            attribs,
+            lambda: with_child(
                 Element(f"{XMLSchema}complexType"),
                 with_children(
                     Element(f"{XMLSchema}sequence"),
-                    [Comment(f"This is a {self.struct_name}")]
+                    comment(f"This is a {self.struct_name}")
                     + [
                         xobj.xsd_out(member, {}, add_ns)
                         for member, xobj in self.objects
@@ -255,6 +657,104 @@ class StructObj(XObject):
             parsed.append((name, xobj.xml_in(child, ctx.next(name))))
         return parsed
 
+    def xml_in_reuse(
+        self,
+        obj: ObjectifiedElement,
+        ctx: XErrorCtx,
+        prev: XParsed | None,
+        digests: Digests,
+    ) -> XParsed:
+        digest = digests[obj]
+        if prev is not None and prev.digest == digest:
+            return prev
+
+        parsed = []
+        for i, (child, (name, xobj)) in enumerate(
+            zip(children(obj), self.objects)
+        ):
+            if child.tag != name:
+                raise ErrorTypes.IncorrectElementTag(
+                    ctx, self.struct_name, obj.tag, i, name, child.tag
+                )
+            parsed.append(
+                xobj.xml_in_reuse(
+                    child, ctx.next(name), nth_child(prev, i), digests
+                )
+            )
+        return XParsed(
+            digest,
+            [(name, p.val) for (name, _), p in zip(self.objects, parsed)],
+            parsed,
+        )
+
+    def xml_step(self, step: Any, ctx: XErrorCtx) -> XStep:
+        if type(step) != int or not 0 <= step < len(self.objects):
+            raise ErrorTypes.InvalidQueryStep(ctx, step, self.struct_name)
+        member, xobj = self.objects[step]
+        return XStep(member, member, first, xobj)
+
+    def xml_signature(self) -> str:
+        members = ",".join(
+            f"{member}:{xobj.xml_signature()}" for member, xobj in self.objects
+        )
+        return f"{self.struct_name}({members})"
+
+    def bin_out(self, val: Any, ctx: XErrorCtx, out: bytearray):
+        if len(val) != len(self.objects):
+            raise ErrorTypes.IncorrectType(
+                ctx, len(self.objects), self.struct_name, val, ctx.trace[-1]
+            )
+        for (member, xobj), v in zip(self.objects, val):
+            xobj.bin_out(v, ctx.next(member), out)
+
+    def bin_in(
+        self, buf: memoryview, pos: int, ctx: XErrorCtx
+    ) -> tuple[list[tuple[str, Any]], int]:
+        parsed = []
+        for member, xobj in self.objects:
+            v, pos = xobj.bin_in(buf, pos, ctx.next(member))
+            parsed.append((member, v))
+        return parsed, pos
+
+    def plain_out(self, val: Any, ctx: XErrorCtx) -> list[Any]:
+        if len(val) != len(self.objects):
+            raise ErrorTypes.IncorrectType(
+                ctx, len(self.objects), self.struct_name, val, ctx.trace[-1]
+            )
+        return [
+            xobj.plain_out(v, ctx.next(member))
+            for (member, xobj), v in zip(self.objects, val)
+        ]
+
+    def plain_in(self, obj: Any, ctx: XErrorCtx) -> list[tuple[str, Any]]:
+        if type(obj) != list or len(obj) != len(self.objects):
+            raise ErrorTypes.InvalidPlain(ctx, obj, self.struct_name)
+        return [
+            (member, xobj.plain_in(v, ctx.next(member)))
+            for (member, xobj), v in zip(self.objects, obj)
+        ]
+
+    def xsd_type_name(self) -> str | None:
+        names = [xobj.xsd_type_name() for _, xobj in self.objects]
+        if None in names:
+            return None
+        return ".".join([pascalize(self.struct_name)] + cast(list[str], names))
+
+    def xml_check(
+        self, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+    ):
+        for i, (child, (name, xobj)) in enumerate(
+            zip(children(obj), self.objects)
+        ):
+            if child.tag != name:
+                errors.append(
+                    ErrorTypes.IncorrectElementTag(
+                        ctx, self.struct_name, obj.tag, i, name, child.tag
+                    )
+                )
+            else:
+                xobj.xml_check(child, ctx.next(name), errors)
+
 
 class TupleObj(XObject):
     """An anonymous struct"""
@@ -273,8 +773,8 @@ class TupleObj(XObject):
     def xsd_out(
         self,
         name: str,
-        attribs: dict[str, str] = {},
-        add_ns: dict[str, str] = {},
+        attribs: dict[str, str] | None = None,
+        add_ns: dict[str, str] | None = None,
     ) -> _Element:
         return self.struct.xsd_out(name, attribs, add_ns)
 
@@ -290,6 +790,51 @@ class TupleObj(XObject):
         # Assumes the objects are in the correct order
         return tuple(zip(*self.struct.xml_in(obj, ctx)))[1]  # type: ignore[no-any-return]
 
+    def xml_in_reuse(
+        self,
+        obj: ObjectifiedElement,
+        ctx: XErrorCtx,
+        prev: XParsed | None,
+        digests: Digests,
+    ) -> XParsed:
+        parsed = self.struct.xml_in_reuse(obj, ctx, prev, digests)
+        if parsed is prev:
+            return prev
+        return XParsed(
+            parsed.digest,
+            tuple(p.val for p in parsed.children),
+            parsed.children,
+        )
+
+    def xml_step(self, step: Any, ctx: XErrorCtx) -> XStep:
+        return self.struct.xml_step(step, ctx)
+
+    def xml_signature(self) -> str:
+        return self.struct.xml_signature()
+
+    def bin_out(self, val: Any, ctx: XErrorCtx, out: bytearray):
+        self.struct.bin_out(val, ctx, out)
+
+    def bin_in(
+        self, buf: memoryview, pos: int, ctx: XErrorCtx
+    ) -> tuple[tuple[Any, ...], int]:
+        parsed, pos = self.struct.bin_in(buf, pos, ctx)
+        return tuple(v for _, v in parsed), pos
+
+    def plain_out(self, val: Any, ctx: XErrorCtx) -> list[Any]:
+        return self.struct.plain_out(val, ctx)
+
+    def plain_in(self, obj: Any, ctx: XErrorCtx) -> tuple[Any, ...]:
+        return tuple(v for _, v in self.struct.plain_in(obj, ctx))
+
+    def xsd_type_name(self) -> str | None:
+        return self.struct.xsd_type_name()
+
+    def xml_check(
+        self, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+    ):
+        self.struct.xml_check(obj, ctx, errors)
+
 
 class SetOBj(XObject):
     """An unordered collection of unique elements"""
@@ -300,8 +845,8 @@ class SetOBj(XObject):
     def xsd_out(
         self,
         name: str,
-        attribs: dict[str, str] = {},
-        add_ns: dict[str, str] = {},
+        attribs: dict[str, str] | None = None,
+        add_ns: dict[str, str] | None = None,
     ) -> _Element:
         return self.list.xsd_out(name, attribs, add_ns)
 
@@ -309,7 +854,12 @@ class SetOBj(XObject):
         return self.list.xml_temp(name)
 
     def xml_out(self, name: str, val: Any, ctx: XErrorCtx) -> _Element:
-        return self.list.xml_out(name, list(val), ctx)
+        elem = self.list.xml_out(name, list(val), ctx)
+        if options().canonical:
+            # JUSTIFY: Set order depends on hashes (which can vary between
+            #          runs), so items are ordered by their canonical xml
+            sorted_children(elem, canonical_bytes)
+        return elem
 
     def xml_in(self, obj: ObjectifiedElement, ctx: XErrorCtx) -> set[Any]:
         parsed: set[Any] = set()
@@ -319,6 +869,67 @@ class SetOBj(XObject):
             parsed.add(item)
         return parsed
 
+    def xml_in_reuse(
+        self,
+        obj: ObjectifiedElement,
+        ctx: XErrorCtx,
+        prev: XParsed | None,
+        digests: Digests,
+    ) -> XParsed:
+        items = self.list.xml_in_reuse(obj, ctx, prev, digests)
+        if items is prev:
+            return prev
+        parsed: set[Any] = set()
+        for item in items.val:
+            if item in parsed:
+                raise ErrorTypes.DuplicateItem(ctx, "set", obj.tag, item)
+            parsed.add(item)
+        return XParsed(items.digest, parsed, items.children)
+
+    def xml_signature(self) -> str:
+        return self.list.xml_signature()
+
+    def bin_out(self, val: Any, ctx: XErrorCtx, out: bytearray):
+        self.list.bin_out(list(val), ctx, out)
+
+    def bin_in(
+        self, buf: memoryview, pos: int, ctx: XErrorCtx
+    ) -> tuple[set[Any], int]:
+        items, pos = self.list.bin_in(buf, pos, ctx)
+        parsed: set[Any] = set()
+        for item in items:
+            if item in parsed:
+                raise ErrorTypes.DuplicateItem(ctx, "set", ctx.trace[-1], item)
+            parsed.add(item)
+        return parsed, pos
+
+    def plain_out(self, val: Any, ctx: XErrorCtx) -> list[Any]:
+        return self.list.plain_out(list(val), ctx)
+
+    def plain_in(self, obj: Any, ctx: XErrorCtx) -> set[Any]:
+        parsed: set[Any] = set()
+        for item in self.list.plain_in(obj, ctx):
+            if item in parsed:
+                raise ErrorTypes.DuplicateItem(ctx, "set", ctx.trace[-1], item)
+            parsed.add(item)
+        return parsed
+
+    def xsd_type_name(self) -> str | None:
+        return self.list.xsd_type_name()
+
+    def xml_check(
+        self, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+    ):
+        seen = set()
+        for identity in self.list.check_items(obj, ctx, errors, identify=True):
+            if identity is None:
+                continue
+            elif identity in seen:
+                errors.append(
+                    ErrorTypes.DuplicateItem(ctx, "set", obj.tag, identity)
+                )
+            seen.add(identity)
+
 
 @dataclass
 class DictObj(XObject):
@@ -333,15 +944,17 @@ class DictObj(XObject):
     def xsd_out(
         self,
         name: str,
-        attribs: dict[str, str] = {},
-        add_ns: dict[str, str] = {},
+        attribs: dict[str, str] | None = None,
+        add_ns: dict[str, str] | None = None,
     ) -> _Element:
-        return with_child(
-            Element(f"{XMLSchema}element", name=name, attrib=attribs),
-            with_children(
+        return xsd_complex(
+            self,
+            name,
+            attribs,
+            lambda: with_children(
                 Element(f"{XMLSchema}complexType"),
-                [
-                    Comment("this is a dictionary!"),
+                comment("this is a dictionary!")
+                + [
                     with_child(
                         Element(f"{XMLSchema}sequence"),
                         with_child(
@@ -389,7 +1002,7 @@ class DictObj(XObject):
     def xml_out(self, name: str, val: Any, ctx: XErrorCtx) -> _Element:
         item_ctx = ctx.next(self.item_name)
 
-        return with_children(
+        elem = with_children(
             Element(name),
             [
                 with_children(
@@ -406,10 +1019,25 @@ class DictObj(XObject):
                 for k, v in val.items()
             ],
         )
+        if options().canonical:
+            # keys are unique, so items are ordered by their key's xml
+            sorted_children(elem, lambda item: canonical_bytes(item[0]))
+        return elem
 
     def xml_in(self, obj: ObjectifiedElement, ctx: XErrorCtx) -> dict[Any, Any]:
-        parsed = {}
-        for child in children(obj):
+        return self.from_items(
+            self.xml_in_items(children(obj), ctx, obj.tag), ctx, obj.tag
+        )
+
+    def xml_in_items(
+        self, items: Iterable[ObjectifiedElement], ctx: XErrorCtx, tag: str
+    ) -> list[tuple[Any, Any]]:
+        """
+        Parse the (key, value) pairs of items in the dictionary (with tag),
+        e.g. for a chunk of a large dictionary
+        """
+        parsed = []
+        for child in items:
             if child.tag != self.item_name:
                 raise ErrorTypes.InvalidDictionaryItem(
                     ctx,
@@ -417,7 +1045,7 @@ class DictObj(XObject):
                     self.key_name,
                     self.val_name,
                     child.tag,
-                    obj.tag,
+                    tag,
                 )
             else:
                 child_ctx = ctx.next(self.item_name)
@@ -427,16 +1055,221 @@ class DictObj(XObject):
                 v = self.val_xobject.xml_in(
                     get(child, self.val_name), child_ctx.next(self.val_name)
                 )
+                parsed.append((k, v))
+                # TODO: Check for other tags? Fail better?
+        return parsed
 
-                if k in parsed:
-                    raise ErrorTypes.DuplicateItem(
-                        ctx, "dictionary", obj.tag, k
-                    )
+    def from_items(
+        self, items: Iterable[tuple[Any, Any]], ctx: XErrorCtx, tag: str
+    ) -> dict[Any, Any]:
+        parsed = {}
+        for k, v in items:
+            if k in parsed:
+                raise ErrorTypes.DuplicateItem(ctx, "dictionary", tag, k)
+            parsed[k] = v
+        return parsed
 
-                parsed[k] = v
-                # TODO: Check for other tags? Fail better?
+    def xml_in_reuse(
+        self,
+        obj: ObjectifiedElement,
+        ctx: XErrorCtx,
+        prev: XParsed | None,
+        digests: Digests,
+    ) -> XParsed:
+        digest = digests[obj]
+        if prev is not None and prev.digest == digest:
+            return prev
+
+        # items are reused if unchanged, otherwise the value of the previous
+        # item with the same key can be partially reused
+        pool = reuse_pool(prev)
+        prev_vals = {
+            item.val[0]: item.children[1]
+            for item in (prev.children if prev is not None else [])
+        }
+        items = []
+        parsed = {}
+        for child in children(obj):
+            if child.tag != self.item_name:
+                raise ErrorTypes.InvalidDictionaryItem(
+                    ctx,
+                    self.item_name,
+                    self.key_name,
+                    self.val_name,
+                    child.tag,
+                    obj.tag,
+                )
+            elif same := pool.get(digests[child]):
+                item = same.pop()
+            else:
+                child_ctx = ctx.next(self.item_name)
+                k = self.key_xobject.xml_in_reuse(
+                    get(child, self.key_name),
+                    child_ctx.next(self.key_name),
+                    None,
+                    digests,
+                )
+                v = self.val_xobject.xml_in_reuse(
+                    get(child, self.val_name),
+                    child_ctx.next(self.val_name),
+                    prev_vals.get(k.val),
+                    digests,
+                )
+                item = XParsed(digests[child], (k.val, v.val), [k, v])
+
+            k_val, v_val = item.val
+            if k_val in parsed:
+                raise ErrorTypes.DuplicateItem(
+                    ctx, "dictionary", obj.tag, k_val
+                )
+            parsed[k_val] = v_val
+            items.append(item)
+        return XParsed(digest, parsed, items)
+
+    def xml_step(self, step: Any, ctx: XErrorCtx) -> XStep:
+        item_name = f"{self.item_name}[{step}]"
+        key_ctx = ctx.next(item_name).next(self.key_name)
+
+        def match_key(item: ObjectifiedElement, _: int) -> bool | None:
+            if (key := item.find(self.key_name)) is None:
+                return None
+            key = cast(ObjectifiedElement, key)
+            return bool(self.key_xobject.xml_in(key, key_ctx) == step)
+
+        return XStep(
+            item_name,
+            self.item_name,
+            match_key,
+            self.val_xobject,
+            inner=self.val_name,
+            by_content=True,
+        )
+
+    def xml_signature(self) -> str:
+        key = f"{self.key_name}:{self.key_xobject.xml_signature()}"
+        val = f"{self.val_name}:{self.val_xobject.xml_signature()}"
+        return f"Dict[{self.item_name}({key},{val})]"
+
+    def bin_out(self, val: Any, ctx: XErrorCtx, out: bytearray):
+        item_ctx = ctx.next(self.item_name)
+        write_uvarint(out, len(val))
+        for k, v in val.items():
+            self.key_xobject.bin_out(k, item_ctx.next(self.key_name), out)
+            self.val_xobject.bin_out(v, item_ctx.next(self.val_name), out)
+
+    def bin_in(
+        self, buf: memoryview, pos: int, ctx: XErrorCtx
+    ) -> tuple[dict[Any, Any], int]:
+        item_ctx = ctx.next(self.item_name)
+        n, pos = read_uvarint(buf, pos)
+        parsed = {}
+        for _ in range(n):
+            k, pos = self.key_xobject.bin_in(
+                buf, pos, item_ctx.next(self.key_name)
+            )
+            v, pos = self.val_xobject.bin_in(
+                buf, pos, item_ctx.next(self.val_name)
+            )
+            if k in parsed:
+                raise ErrorTypes.DuplicateItem(
+                    ctx, "dictionary", ctx.trace[-1], k
+                )
+            parsed[k] = v
+        return parsed, pos
+
+    def string_keys(self) -> bool:
+        return (
+            isinstance(self.key_xobject, BasicObj)
+            and self.key_xobject.type_str == "string"
+        )
+
+    def plain_out(self, val: Any, ctx: XErrorCtx) -> Any:
+        # JUSTIFY: json objects can only have string keys, so other
+        #          dictionaries are lists of [key, value] pairs
+        item_ctx = ctx.next(self.item_name)
+        items = [
+            (
+                self.key_xobject.plain_out(k, item_ctx.next(self.key_name)),
+                self.val_xobject.plain_out(v, item_ctx.next(self.val_name)),
+            )
+            for k, v in val.items()
+        ]
+        if self.string_keys():
+            return dict(items)
+        else:
+            return [[k, v] for k, v in items]
+
+    def plain_in(self, obj: Any, ctx: XErrorCtx) -> dict[Any, Any]:
+        if self.string_keys() and type(obj) == dict:
+            items = list(obj.items())
+        elif not self.string_keys() and type(obj) == list:
+            items = []
+            for item in obj:
+                if type(item) != list or len(item) != 2:
+                    raise ErrorTypes.InvalidPlain(ctx, item, "[key, value]")
+                items.append((item[0], item[1]))
+        else:
+            raise ErrorTypes.InvalidPlain(ctx, obj, "dictionary")
+
+        item_ctx = ctx.next(self.item_name)
+        parsed = {}
+        for k_obj, v_obj in items:
+            k = self.key_xobject.plain_in(k_obj, item_ctx.next(self.key_name))
+            if k in parsed:
+                raise ErrorTypes.DuplicateItem(
+                    ctx, "dictionary", ctx.trace[-1], k
+                )
+            parsed[k] = self.val_xobject.plain_in(
+                v_obj, item_ctx.next(self.val_name)
+            )
         return parsed
 
+    def xsd_type_name(self) -> str | None:
+        key_name = self.key_xobject.xsd_type_name()
+        val_name = self.val_xobject.xsd_type_name()
+        if key_name is None or val_name is None:
+            return None
+        return f"Dict.{key_name}.{val_name}"
+
+    def xml_check(
+        self, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+    ):
+        seen = set()
+        for child in children(obj):
+            if (
+                child.tag != self.item_name
+                or (key_elem := opt_get(child, self.key_name)) is None
+                or (val_elem := opt_get(child, self.val_name)) is None
+            ):
+                errors.append(
+                    ErrorTypes.InvalidDictionaryItem(
+                        ctx,
+                        self.item_name,
+                        self.key_name,
+                        self.val_name,
+                        child.tag,
+                        obj.tag,
+                    )
+                )
+                continue
+
+            child_ctx = ctx.next(self.item_name)
+            key = check_identity(
+                self.key_xobject,
+                key_elem,
+                child_ctx.next(self.key_name),
+                errors,
+            )
+            if key in seen:
+                errors.append(
+                    ErrorTypes.DuplicateItem(ctx, "dictionary", obj.tag, key)
+                )
+            elif key is not None:
+                seen.add(key)
+            self.val_xobject.xml_check(
+                val_elem, child_ctx.next(self.val_name), errors
+            )
+
 
 def resolve_type(v: Any) -> AnyType:
     """Determine the type of some value, using primitive types
@@ -470,15 +1303,17 @@ class UnionObj(XObject):
     def xsd_out(
         self,
         name: str,
-        attribs: dict[str, str] = {},
-        add_ns: dict[str, str] = {},
+        attribs: dict[str, str] | None = None,
+        add_ns: dict[str, str] | None = None,
     ) -> _Element:
-        return with_child(
-            Element(f"{XMLSchema}element", name=name, attrib=attribs),
-            with_children(
+        return xsd_complex(
+            self,
+            name,
+            attribs,
+            lambda: with_children(
                 Element(f"{XMLSchema}complexType"),
-                [
-                    Comment("this is a union!"),
+                comment("this is a union!")
+                + [
                     with_children(
                         Element(f"{XMLSchema}sequence"),
                         [
@@ -535,6 +1370,130 @@ class UnionObj(XObject):
                 ctx, str(obj.tag), list(named.keys()), str(variant)
             )
 
+    def xml_in_reuse(
+        self,
+        obj: ObjectifiedElement,
+        ctx: XErrorCtx,
+        prev: XParsed | None,
+        digests: Digests,
+    ) -> XParsed:
+        digest = digests[obj]
+        if prev is not None and prev.digest == digest:
+            return prev
+
+        named = {self.elem_gen(t): xobj for t, xobj in self.xobjects.items()}
+        variants = list(children(obj))
+
+        if len(variants) != 1:
+            raise ErrorTypes.MultipleVariants(ctx, [v.tag for v in variants])
+
+        variant = variants[0]
+        if (xobj := named.get(variant.tag)) is not None:
+            # a previous value of another variant has a different type
+            same = prev is not None and prev.tag == variant.tag
+            parsed = xobj.xml_in_reuse(
+                variant,
+                ctx.next(variant.tag),
+                nth_child(prev, 0) if same else None,
+                digests,
+            )
+            return XParsed(digest, parsed.val, [parsed], variant.tag)
+        else:
+            raise ErrorTypes.ParseInvalidVariant(
+                ctx, str(obj.tag), list(named.keys()), str(variant)
+            )
+
+    def xml_signature(self) -> str:
+        # the order of variants does not affect the xml
+        variants = sorted(
+            f"{self.elem_gen(t)}:{xobj.xml_signature()}"
+            for t, xobj in self.xobjects.items()
+        )
+        return f"Union({'|'.join(variants)})"
+
+    @cached_property
+    def sorted_variants(self) -> list[tuple[AnyType, XObject]]:
+        """
+        The variants sorted by element name
+        - The order of variants in the union does not affect its fingerprint,
+          so variants are encoded by their index in this order
+        """
+        return sorted(self.xobjects.items(), key=lambda v: self.elem_gen(v[0]))
+
+    def bin_out(self, val: Any, ctx: XErrorCtx, out: bytearray):
+        t = resolve_type(val)
+        for i, (variant_t, xobj) in enumerate(self.sorted_variants):
+            if variant_t == t:
+                write_uvarint(out, i)
+                return xobj.bin_out(val, ctx.next(self.elem_gen(t)), out)
+        raise ErrorTypes.InvalidVariant(
+            ctx, ctx.trace[-1], list(self.xobjects.keys()), t, val
+        )
+
+    def bin_in(
+        self, buf: memoryview, pos: int, ctx: XErrorCtx
+    ) -> tuple[Any, int]:
+        i, pos = read_uvarint(buf, pos)
+        variants = self.sorted_variants
+        if i >= len(variants):
+            raise ErrorTypes.ParseInvalidVariant(
+                ctx,
+                ctx.trace[-1],
+                [self.elem_gen(t) for t, _ in variants],
+                f"variant {i}",
+            )
+        t, xobj = variants[i]
+        return xobj.bin_in(buf, pos, ctx.next(self.elem_gen(t)))
+
+    def plain_out(self, val: Any, ctx: XErrorCtx) -> dict[str, Any]:
+        t = resolve_type(val)
+        if (val_xobj := self.xobjects.get(t)) is not None:
+            variant_name = self.elem_gen(t)
+            return {
+                variant_name: val_xobj.plain_out(val, ctx.next(variant_name))
+            }
+        else:
+            raise ErrorTypes.InvalidVariant(
+                ctx, ctx.trace[-1], list(self.xobjects.keys()), t, val
+            )
+
+    def plain_in(self, obj: Any, ctx: XErrorCtx) -> Any:
+        if type(obj) != dict or len(obj) != 1:
+            raise ErrorTypes.InvalidPlain(ctx, obj, "{variant: value}")
+        named = {self.elem_gen(t): xobj for t, xobj in self.xobjects.items()}
+        ((variant, v),) = obj.items()
+        if (xobj := named.get(variant)) is not None:
+            return xobj.plain_in(v, ctx.next(variant))
+        else:
+            raise ErrorTypes.ParseInvalidVariant(
+                ctx, ctx.trace[-1], list(named.keys()), str(variant)
+            )
+
+    def xsd_type_name(self) -> str | None:
+        names = [xobj.xsd_type_name() for xobj in self.xobjects.values()]
+        if None in names:
+            return None
+        return ".".join(["Union"] + cast(list[str], names))
+
+    def xml_check(
+        self, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+    ):
+        named = {self.elem_gen(t): xobj for t, xobj in self.xobjects.items()}
+        variants = list(children(obj))
+
+        if len(variants) != 1:
+            errors.append(
+                ErrorTypes.MultipleVariants(ctx, [v.tag for v in variants])
+            )
+        elif (xobj := named.get(variants[0].tag)) is not None:
+            xobj.xml_check(variants[0], ctx.next(variants[0].tag), errors)
+        else:
+            errors.append(
+                ErrorTypes.ParseInvalidVariant(
+                    ctx, str(obj.tag), list(named.keys()), str(variants[0])
+                )
+            )
+
 
 class NoneObj(XObject):
     """
@@ -545,12 +1504,12 @@ class NoneObj(XObject):
     def xsd_out(
         self,
         name: str,
-        attribs: dict[str, str] = {},
-        add_ns: dict[str, str] = {},
+        attribs: dict[str, str] | None = None,
+        add_ns: dict[str, str] | None = None,
     ) -> _Element:
-        return with_child(
+        return with_children(
             Element(f"{XMLSchema}element", name=name, attrib=attribs),
-            Comment("This is a None type"),
+            comment("This is a None type"),
         )
 
     def xml_temp(self, name: str) -> _Element:
@@ -560,11 +1519,392 @@ class NoneObj(XObject):
         if val != None:
             raise ErrorTypes.NoneIsSome(ctx, name, val)
 
-        return with_child(Element(name), Comment("This is None"))
+        return with_children(Element(name), comment("This is None"))
 
     def xml_in(self, obj: ObjectifiedElement, ctx: XErrorCtx) -> Any:
         return None
 
+    def xml_signature(self) -> str:
+        return "None"
+
+    def bin_out(self, val: Any, ctx: XErrorCtx, out: bytearray):
+        if val != None:
+            raise ErrorTypes.NoneIsSome(ctx, ctx.trace[-1], val)
+
+    def bin_in(
+        self, buf: memoryview, pos: int, ctx: XErrorCtx
+    ) -> tuple[Any, int]:
+        return None, pos
+
+    def plain_out(self, val: Any, ctx: XErrorCtx) -> None:
+        if val != None:
+            raise ErrorTypes.NoneIsSome(ctx, ctx.trace[-1], val)
+
+    def plain_in(self, obj: Any, ctx: XErrorCtx) -> None:
+        if obj != None:
+            raise ErrorTypes.NoneIsSome(ctx, ctx.trace[-1], obj)
+
+    def xsd_type_name(self) -> str | None:
+        return "None"
+
+    def xml_check(
+        self, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+    ):
+        pass
+
+
+def first_parsed(parse: Callable[[], Any], fallback: Callable[[], Any]) -> Any:
+    """
+    The value from parse, or from fallback if parse fails (raising parse's
+    error if both fail)
+    """
+    try:
+        return parse()
+    except XError as e:
+        try:
+            return fallback()
+        except XError:
+            raise e from None
+
+
+@dataclass
+class OptionalObj(XObject):
+    """
+    An optional value (`T | None`)
+    - The value is in the element itself, None is an element with
+      xsi:nil="true" (rather than a union's variant elements)
+    - Elements in the layout of previous versions (legacy, a union including
+      None, e.g. `<Port><Int>5</Int></Port>` and `<Port><NoneType/></Port>`)
+      are still parsed, tried only when the element fails to parse as T
+    """
+
+    xobject: XObject
+    legacy: UnionObj
+
+    def xsd_out(
+        self,
+        name: str,
+        attribs: dict[str, str] | None = None,
+        add_ns: dict[str, str] | None = None,
+    ) -> _Element:
+        return self.xobject.xsd_out(
+            name, {**(attribs or {}), "nillable": "true"}, add_ns
+        )
+
+    def xml_temp(self, name: str) -> _Element:
+        elem = self.xobject.xml_temp(name)
+        # the comment goes first (before the template's text)
+        optional = Comment('This is optional, xsi:nil="true" for None')
+        optional.tail, elem.text = elem.text, None
+        elem.insert(0, optional)
+        return elem
+
+    def xml_out(self, name: str, val: Any, ctx: XErrorCtx) -> _Element:
+        if val is None:
+            return nil_element(name)
+        return self.xobject.xml_out(name, val, ctx)
+
+    @cached_property
+    def legacy_names(self) -> set[str]:
+        return {self.legacy.elem_gen(t) for t in self.legacy.xobjects}
+
+    def is_legacy(self, obj: ObjectifiedElement) -> bool:
+        """
+        If obj is in the legacy layout (no text, and a single variant element)
+        - T's own layout can look the same (e.g. a class with one member named
+          like a variant), so legacy elements are parsed as T if they fail
+        """
+        if obj.text is not None and not obj.text.isspace():
+            return False
+        variants = list(children(obj))
+        return len(variants) == 1 and variants[0].tag in self.legacy_names
+
+    def xml_in(self, obj: ObjectifiedElement, ctx: XErrorCtx) -> Any:
+        if obj.get(XSINil) == "true":
+            return None
+        elif self.is_legacy(obj):
+            return first_parsed(
+                lambda: self.legacy.xml_in(obj, ctx),
+                lambda: self.xobject.xml_in(obj, ctx),
+            )
+        return self.xobject.xml_in(obj, ctx)
+
+    def xml_in_reuse(
+        self,
+        obj: ObjectifiedElement,
+        ctx: XErrorCtx,
+        prev: XParsed | None,
+        digests: Digests,
+    ) -> XParsed:
+        if obj.get(XSINil) == "true":
+            return XParsed(digests[obj], None)
+        elif self.is_legacy(obj):
+            return cast(
+                XParsed,
+                first_parsed(
+                    lambda: self.legacy.xml_in_reuse(obj, ctx, prev, digests),
+                    lambda: self.xobject.xml_in_reuse(obj, ctx, prev, digests),
+                ),
+            )
+        return self.xobject.xml_in_reuse(obj, ctx, prev, digests)
+
+    def xml_signature(self) -> str:
+        return f"Optional({self.xobject.xml_signature()})"
+
+    def xml_step(self, step: Any, ctx: XErrorCtx) -> XStep:
+        return self.xobject.xml_step(step, ctx)
+
+    def bin_out(self, val: Any, ctx: XErrorCtx, out: bytearray):
+        write_bool(out, val is not None)
+        if val is not None:
+            self.xobject.bin_out(val, ctx, out)
+
+    def bin_in(
+        self, buf: memoryview, pos: int, ctx: XErrorCtx
+    ) -> tuple[Any, int]:
+        present, pos = read_bool(buf, pos)
+        if not present:
+            return None, pos
+        return self.xobject.bin_in(buf, pos, ctx)
+
+    def plain_out(self, val: Any, ctx: XErrorCtx) -> Any:
+        return None if val is None else self.xobject.plain_out(val, ctx)
+
+    def plain_in(self, obj: Any, ctx: XErrorCtx) -> Any:
+        return None if obj is None else self.xobject.plain_in(obj, ctx)
+
+    def xsd_type_name(self) -> str | None:
+        if (name := self.xobject.xsd_type_name()) is None:
+            return None
+        return f"Optional.{name}"
+
+    def xml_check(
+        self, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+    ):
+        if obj.get(XSINil) == "true":
+            return
+        elif self.is_legacy(obj):
+            legacy_errors: list[XError] = []
+            self.legacy.xml_check(obj, ctx, legacy_errors)
+            if len(legacy_errors) > 0:
+                t_errors: list[XError] = []
+                self.xobject.xml_check(obj, ctx, t_errors)
+                if len(t_errors) > 0:
+                    errors.extend(legacy_errors)
+        else:
+            self.xobject.xml_check(obj, ctx, errors)
+
+
+# NOTE: Integer arrays are named by their size (e.g. 'l' is 4 bytes on some
+#       platforms, and 8 on others)
+INTEGER_TYPECODES = "bBhHiIlLqQ"
+INTEGER_ITEMS = {1: "byte", 2: "short", 4: "int", 8: "long"}
+FLOAT_ITEMS = {"f": "float", "d": "double"}
+
+# python's float text for non-finite values, to the xsd's
+XSD_FLOATS = {"inf": "INF", "-inf": "-INF", "nan": "NaN"}
+
+
+def array_item_type(typecode: str) -> str | None:
+    """The xsd type of an array's items (None if not numeric)"""
+    if typecode in FLOAT_ITEMS:
+        return FLOAT_ITEMS[typecode]
+    elif len(typecode) == 1 and typecode in INTEGER_TYPECODES:
+        size_name = INTEGER_ITEMS[array(typecode).itemsize]
+        return (
+            size_name if typecode.islower() else f"unsigned{size_name.title()}"
+        )
+    else:
+        return None
+
+
+def format_array(arr: array) -> str:
+    text = " ".join(map(repr, arr))
+    # JUSTIFY: Only non-finite floats contain an 'n', so the text only needs
+    #          rewriting if it contains one
+    if arr.typecode in FLOAT_ITEMS and "n" in text:
+        text = " ".join(XSD_FLOATS.get(t, t) for t in text.split(" "))
+    return text
+
+
+def parse_array(typecode: str, text: str | None) -> array:
+    """Parse whitespace separated numbers in bulk"""
+    if not text:
+        return array(typecode)
+    convert = float if typecode in FLOAT_ITEMS else int
+    return array(typecode, map(convert, text.split()))
+
+
+def shorten(text: str | None, length: int = 64) -> str | None:
+    """Shorten (potentially huge) text for errors"""
+    if text is None or len(text) <= length:
+        return text
+    return f"{text[:length]}..."
+
+
+@dataclass
+class ArrayObj(XObject):
+    """
+    A contiguous array of numbers (`array.array`, or a 1d numpy array)
+    - Written as the whitespace separated text of one element (an xs:list),
+      rather than an element per item, and parsed in bulk
+    - Values are converted to/from an `array.array` by to_array/from_array
+      (to_array gives None for invalid values)
+    """
+
+    typecode: str
+    item_type: str
+    to_array: Callable[[Any], array | None]
+    from_array: Callable[[array], Any]
+
+    def xsd_out(
+        self,
+        name: str,
+        attribs: dict[str, str] | None = None,
+        add_ns: dict[str, str] | None = None,
+    ) -> _Element:
+        type_name, nsmap = xs_qualified(self.item_type, add_ns)
+        return xsd_complex(
+            self,
+            name,
+            attribs,
+            lambda: with_child(
+                Element(f"{XMLSchema}simpleType"),
+                Element(f"{XMLSchema}list", itemType=type_name, nsmap=nsmap),
+            ),
+        )
+
+    def xml_temp(self, name: str) -> _Element:
+        return with_text(
+            Element(name), f"Fill me with {self.item_type}s separated by spaces"
+        )
+
+    def xml_out(self, name: str, val: Any, ctx: XErrorCtx) -> _Element:
+        return with_text(Element(name), format_array(self.checked(val, ctx)))
+
+    def xml_in(self, obj: ObjectifiedElement, ctx: XErrorCtx) -> Any:
+        try:
+            return self.from_array(parse_array(self.typecode, obj.text))
+        except (ValueError, OverflowError) as e:
+            raise ErrorTypes.ParseFailure(
+                ctx, shorten(obj.text), f"{self.item_type} array", e
+            )
+
+    def xml_signature(self) -> str:
+        return f"Array({self.item_type})"
+
+    def bin_out(self, val: Any, ctx: XErrorCtx, out: bytearray):
+        arr = self.checked(val, ctx)
+        if sys.byteorder == "big":
+            arr = array(arr.typecode, arr)
+            arr.byteswap()
+        write_uvarint(out, len(arr))
+        out += arr
+
+    def bin_in(
+        self, buf: memoryview, pos: int, ctx: XErrorCtx
+    ) -> tuple[Any, int]:
+        n, pos = read_uvarint(buf, pos)
+        arr = array(self.typecode)
+        end = pos + n * arr.itemsize
+        if end > len(buf):
+            raise IndexError(
+                f"{n} items at {pos} is beyond the end of the buffer"
+            )
+        arr.frombytes(buf[pos:end])
+        if sys.byteorder == "big":
+            arr.byteswap()
+        return self.from_array(arr), end
+
+    def plain_out(self, val: Any, ctx: XErrorCtx) -> Any:
+        return self.checked(val, ctx).tolist()
+
+    def plain_in(self, obj: Any, ctx: XErrorCtx) -> Any:
+        if type(obj) != list:
+            raise ErrorTypes.InvalidPlain(ctx, obj, f"{self.item_type} array")
+        try:
+            return self.from_array(array(self.typecode, obj))
+        except (TypeError, OverflowError):
+            raise ErrorTypes.InvalidPlain(ctx, obj, f"{self.item_type} array")
+
+    def xsd_type_name(self) -> str | None:
+        return f"{pascalize(self.item_type)}Array"
+
+    def xml_check(
+        self, obj: ObjectifiedElement, ctx: XErrorCtx, errors: list[XError]
+    ):
+        try:
+            parse_array(self.typecode, obj.text)
+        except (ValueError, OverflowError) as e:
+            errors.append(
+                ErrorTypes.ParseFailure(
+                    ctx, shorten(obj.text), f"{self.item_type} array", e
+                )
+            )
+
+    def checked(self, val: Any, ctx: XErrorCtx) -> array:
+        if (arr := self.to_array(val)) is None:
+            raise ErrorTypes.InvalidData(ctx, val, f"{self.item_type} array")
+        return arr
+
+
+def array_xobject(data_type: AnyType, typecode: str | None) -> ArrayObj:
+    """
+    An xobject for `array.array` (typecode "d" by default), or a numpy array
+    (by default of the dtype given by `numpy.typing.NDArray[...]`, or float64)
+    """
+    is_numpy = data_type is not array
+    if typecode is None and is_numpy and len(args := get_args(data_type)) == 2:
+        # NDArray[numpy.float32] -> ndarray[Any, dtype[float32]]
+        scalar_types = get_args(args[1])
+        if len(scalar_types) == 1 and isinstance(scalar_types[0], type):
+            typecode = numpy.dtype(scalar_types[0]).char
+    typecode = typecode or "d"
+    if (item_type := array_item_type(typecode)) is None:
+        raise ErrorTypes.InvalidTypecode(
+            typename(data_type), typecode, INTEGER_TYPECODES + "fd"
+        )
+
+    if is_numpy:
+
+        def to_array(val: Any) -> array | None:
+            if (
+                isinstance(val, numpy.ndarray)
+                and val.ndim == 1
+                and val.dtype == numpy.dtype(typecode)
+            ):
+                return array(typecode, val.tobytes())
+            return None
+
+        def from_array(arr: array) -> Any:
+            # the parsed array's buffer is used without copying
+            return (
+                numpy.frombuffer(arr, dtype=typecode)
+                if len(arr)
+                else numpy.empty(0, dtype=typecode)
+            )
+
+    else:
+
+        def to_array(val: Any) -> array | None:
+            if isinstance(val, array) and val.typecode == typecode:
+                return val
+            return None
+
+        def from_array(arr: array) -> Any:
+            return arr
+
+    return ArrayObj(typecode, item_type, to_array, from_array)
+
+
+def is_array_type(data_type: AnyType) -> bool:
+    return data_type is array or (
+        numpy is not None
+        and (
+            data_type is numpy.ndarray or get_origin(data_type) is numpy.ndarray
+        )
+    )
+
 
 def is_xmlified(cls):
     return (
@@ -604,10 +1944,28 @@ def gen_xobject(data_type: AnyType, forward_dec: set[AnyType]) -> XObject:
         # a: list[None] -> None is an instance of NoneType
         # a: int | None -> Union of int and NoneType
         return NoneObj()
-    elif isinstance(data_type, UnionType):
-        return UnionObj(
-            {t: gen_xobject(t, forward_dec) for t in get_args(data_type)}
-        )
+    elif get_origin(data_type) is Annotated:
+        # Annotated[array.array, "f"] -> an array of typecode "f", other
+        # metadata is ignored
+        base_type, *metadata = get_args(data_type)
+        if is_array_type(base_type):
+            typecodes = [m for m in metadata if isinstance(m, str)]
+            return array_xobject(base_type, typecodes[0] if typecodes else None)
+        return gen_xobject(base_type, forward_dec)
+    elif is_array_type(data_type):
+        return array_xobject(data_type, None)
+    elif isinstance(data_type, UnionType) or get_origin(data_type) is Union:
+        # NOTE: unions including Annotated types are typing.Union (as Annotated
+        #       types do not support |), e.g. Annotated[array, "f"] | None
+        variants = [t for t in get_args(data_type) if t is not NoneType]
+        xobjects = {t: gen_xobject(t, forward_dec) for t in variants}
+        if len(variants) == len(get_args(data_type)):
+            return UnionObj(xobjects)
+        legacy = UnionObj({**xobjects, NoneType: NoneObj()})
+        if len(variants) == 1:
+            return OptionalObj(xobjects[variants[0]], legacy)
+        else:
+            return OptionalObj(UnionObj(xobjects), legacy)
     else:
         t_name = typename(data_type)
         if t_name == "list":
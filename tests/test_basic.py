@@ -1,8 +1,12 @@
-from dataclasses import dataclass
+import json
+from array import array
+from dataclasses import dataclass, field
 from lxml import etree, objectify
-from typing import Any
+from typing import Annotated, Any
+import pytest
 
 from xmlable import *
+from xmlable._errors import XError
 
 
 def validate(obj: Any):
@@ -19,10 +23,45 @@ def validate(obj: Any):
 
     # validation check
     xsd_schema.assertValid(xml)
+    assert obj_cls.validate(xml_object) == [], "Valid xml has errors"
     assert obj == obj_cls.parse(
         xml_object
     ), "Parsed object does not match source"
 
+    # binary round trip
+    assert obj == obj_cls.from_binary(
+        obj.to_binary()
+    ), "Decoded binary does not match source"
+
+    # plain data round trip (through json)
+    assert obj == obj_cls.from_plain(
+        json.loads(json.dumps(obj.to_plain()))
+    ), "Plain data does not match source"
+
+    # without comments (only templates keep them)
+    bare_xsd = obj_cls.xsd(schema_name, comments=False)
+    bare = obj.xml_value(schema_name, comments=False)
+    for tree in [bare_xsd, bare]:
+        assert b"<!--" not in etree.tostring(tree), "Comments were not omitted"
+    etree.XMLSchema(bare_xsd).assertValid(bare)
+    assert obj == obj_cls.parse(
+        objectify.fromstring(etree.tostring(bare))
+    ), "Parsed xml without comments does not match source"
+
+    # sparse xml (members equal to their defaults omitted) is valid
+    sparse = obj.xml_value(schema_name, sparse=True)
+    xsd_schema.assertValid(sparse)
+    assert obj == obj_cls.parse(
+        objectify.fromstring(etree.tostring(sparse))
+    ), "Parsed sparse xml does not match source"
+
+    # canonical xml is valid, and the same for equal values
+    xsd_schema.assertValid(obj.xml_value(schema_name, canonical=True))
+    canonical = canonical_xml(obj)
+    parsed = obj_cls.parse(objectify.fromstring(canonical))
+    assert obj == parsed, "Parsed canonical xml does not match source"
+    assert canonical == canonical_xml(parsed), "Canonical xml is not stable"
+
 
 def test_scalar_classes():
     @xmlify
@@ -212,3 +251,201 @@ def test_advanced_test():
     )
 
     validate(c1)
+
+
+def test_fingerprint():
+    def make(second: type) -> type:
+        @xmlify
+        @dataclass
+        class Inner:
+            x: list[int]
+
+        @xmlify
+        @dataclass
+        class Outer:
+            a: Inner
+            b: dict[str, second]  # type: ignore[valid-type]
+
+        return Outer
+
+    same = make(int | str).xml_fingerprint()
+    assert len(same) == 64
+    assert same == make(int | str).xml_fingerprint()
+    assert same == make(str | int).xml_fingerprint()
+    assert same != make(int).xml_fingerprint()
+    assert same != make(int | float).xml_fingerprint()
+
+
+def test_binary_union_order():
+    def make(variants: Any) -> type:
+        @xmlify
+        @dataclass
+        class U:
+            x: variants
+
+        return U
+
+    # reordered unions have the same fingerprint, so must decode each other
+    A, B = make(int | bool), make(bool | int)
+    for val in [True, 7, False, -1]:
+        assert B.from_binary(A(val).to_binary()).x == val
+        assert type(B.from_binary(A(val).to_binary()).x) is type(val)
+        assert A.from_binary(B(val).to_binary()).x == val
+
+
+def test_shared_types():
+    @xmlify
+    @dataclass
+    class Inner:
+        a: dict[str, int]
+        b: list[int]
+
+    @xmlify
+    @dataclass
+    class Outer:
+        a: dict[str, int]
+        b: list[dict[str, int]]
+        c: Inner
+        d: set[int]
+
+    xsd = Outer.xsd().getroot()
+    names = [
+        ct.get("name")
+        for ct in xsd.iterchildren(
+            "{http://www.w3.org/2001/XMLSchema}complexType"
+        )
+    ]
+    assert sorted(names) == sorted(
+        ["Inner", "Outer", "Dict.String.Integer", "List.Integer"]
+        + ["List.Dict.String.Integer", "Set.Integer"]
+    )
+    validate(Outer({"a": 1}, [{}, {"b": 2}], Inner({"c": 3}, [4]), {5, 6}))
+
+
+def test_namespaces():
+    @xmlify
+    @dataclass
+    class Inner:
+        a: int
+
+    @xmlify
+    @dataclass
+    class Outer:
+        a: list[int]
+        b: dict[str, Inner]
+
+    for namespaces in [{}, {"xsd": "http://www.w3.org/2001/XMLSchema"}]:
+        original = dict(namespaces)
+        xsd = etree.tostring(Outer.xsd(namespaces=namespaces))
+        assert namespaces == original
+        assert xsd.count(b"xmlns:") == 1
+    assert Outer.xsd().getroot().nsmap == {
+        "xs": "http://www.w3.org/2001/XMLSchema"
+    }
+
+
+def test_sparse():
+    @xmlify
+    @dataclass
+    class Inner:
+        a: int
+        b: str = "b"
+
+    @xmlify
+    @dataclass
+    class Outer:
+        inner: Inner
+        ports: list[int] = field(default_factory=list)
+        opt: int | None = None
+        names: dict[str, Inner] = field(default_factory=dict)
+
+    full = Outer(Inner(1, "c"), [1], 2, {"x": Inner(2)})
+    defaults = Outer(Inner(1))
+    for obj in [full, defaults]:
+        validate(obj)
+
+    sparse = etree.tostring(defaults.xml_value(sparse=True))
+    assert sparse == b"<Outer><Inner><A>1</A></Inner></Outer>"
+    parsed = Outer.parse(objectify.fromstring(sparse))
+    assert parsed == defaults
+    assert parsed.ports is not Outer.parse(objectify.fromstring(sparse)).ports
+
+
+def test_optionals():
+    @xmlify
+    @dataclass
+    class Inner:
+        a: int
+
+    @xmlify
+    @dataclass
+    class Opts:
+        port: int | None
+        inner: Inner | None
+        names: tuple[str | None, int]
+        either: int | str | None
+        lookup: dict[str, float | None]
+
+    for obj in [
+        Opts(1, Inner(2), ("a", 1), "b", {"x": None, "y": 1.5}),
+        Opts(None, None, (None, 2), None, {}),
+        Opts(None, Inner(3), ("", 3), 4, {"z": None}),
+    ]:
+        validate(obj)
+
+    xml = etree.tostring(Opts(5, None, (None, 1), None, {}).xml_value())
+    assert xml.count(b"xmlns:xsi") == 1
+    assert b"<Port>5</Port>" in xml
+    assert b'<Inner xsi:nil="true"/>' in xml
+    assert b'<Item-1 xsi:nil="true"/>' in xml
+
+    xsd = etree.tostring(Opts.xsd())
+    assert b'name="Port" type="xs:integer" nillable="true"' in xsd
+
+    # the layout of previous versions (a union including None) still parses
+    legacy = objectify.fromstring(
+        "<Opts><Port><Int>5</Int></Port><Inner><NoneType/></Inner>"
+        "<Names><Item-1><Str>a</Str></Item-1><Item-2>1</Item-2></Names>"
+        "<Either><NoneType/></Either><Lookup><Item><Key>x</Key>"
+        "<Val><NoneType/></Val></Item></Lookup></Opts>"
+    )
+    assert Opts.parse(legacy) == Opts(5, None, ("a", 1), None, {"x": None})
+    assert Opts.validate(legacy) == []
+    legacy.Port.Int._setText("five")
+    with pytest.raises(XError):
+        Opts.parse(legacy)
+    assert len(Opts.validate(legacy)) == 1
+
+    # the optional comment precedes the template's text
+    template = etree.tostring(Opts.xml())
+    assert (
+        b'<Port><!--This is optional, xsi:nil="true" for None-->Fill'
+        in template
+    )
+
+
+def test_arrays():
+    @xmlify
+    @dataclass
+    class Series:
+        samples: array
+        counts: Annotated[array, "i"]
+        small: Annotated[array, "B"] = field(default_factory=lambda: array("B"))
+        weights: Annotated[array, "f"] | None = None
+
+    for obj in [
+        Series(array("d", [1.5, -2e300, 0.1]), array("i", [1, -2, 3])),
+        Series(array("d"), array("i"), array("B", [255]), array("f", [0.5])),
+        Series(array("d", [float("inf")]), array("i", [0]), array("B", [])),
+    ]:
+        validate(obj)
+
+    xml = etree.tostring(
+        Series(array("d", [1.5, float("-inf")]), array("i", [7, 8])).xml_value()
+    )
+    assert b"<Samples>1.5 -INF</Samples>" in xml
+    assert b"<Counts>7 8</Counts>" in xml
+
+    xsd = etree.tostring(Series.xsd())
+    assert b'<xs:list itemType="xs:double"/>' in xsd
+    assert b'<xs:list itemType="xs:unsignedByte"/>' in xsd
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from pathlib import Path
+import pytest
+
+from xmlable import *
+from xmlable import _cli
+from xmlable._cli import main
+
+
+@xmlify
+@dataclass
+class Record:
+    id: int
+    tags: set[str]
+
+
+CLS = f"{__name__}:Record"
+
+
+def write_records(tmp_path: Path, n: int) -> Path:
+    data = tmp_path / "data"
+    for i in range(n):
+        (data / str(i % 3)).mkdir(parents=True, exist_ok=True)
+        write_xml_value(data / str(i % 3) / f"{i}.xml", Record(i, {"b", "a"}))
+    return data
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_validate(tmp_path: Path, jobs: str, capsys: pytest.CaptureFixture):
+    data = write_records(tmp_path, 9)
+    assert main(["validate", CLS, str(data), "-j", jobs]) == 0
+    assert "9 processed" in capsys.readouterr().out
+
+    (data / "1" / "4.xml").write_text("<Record><Id>x</Id><Tags/></Record>")
+    assert main(["validate", CLS, str(data), "-j", jobs, "-q"]) == 1
+    out = capsys.readouterr().out
+    assert "FAIL" in out and "Parse Failure" in out and "1 failed" in out
+
+
+def test_format(tmp_path: Path):
+    data = write_records(tmp_path, 6)
+    out = tmp_path / "out"
+    assert main(["format", CLS, str(data), "-o", str(out), "--canonical"]) == 0
+    assert sorted(p.name for p in out.rglob("*.xml")) == sorted(
+        f"{i}.xml" for i in range(6)
+    )
+    assert (out / "2" / "5.xml").read_bytes() == canonical_xml(
+        Record(5, {"a", "b"})
+    )
+
+
+def test_format_in_place(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    data = write_records(tmp_path, 3)
+    path = data / "1" / "1.xml"
+    path.chmod(0o640)
+    assert main(["format", CLS, str(data), "--canonical"]) == 0
+    assert path.read_bytes() == canonical_xml(Record(1, {"a", "b"}))
+    assert path.stat().st_mode & 0o777 == 0o640
+
+    # a failure while writing leaves the file as it was
+    def write_partly(f, *_):
+        f.write(b"<Record>")
+        raise OSError("disk full")
+
+    original = path.read_bytes()
+    monkeypatch.setattr(_cli, "write_tree", write_partly)
+    assert main(["format", CLS, str(data), "-j", "1"]) == 1
+    assert path.read_bytes() == original
+    assert sorted(p.name for p in data.rglob("*")) == sorted(
+        ["0", "1", "2", "0.xml", "1.xml", "2.xml"]
+    )
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_format_malformed(
+    tmp_path: Path, jobs: str, capsys: pytest.CaptureFixture
+):
+    data = write_records(tmp_path, 6)
+    (data / "0" / "0.xml").write_text("<Record><Id>0</Id>")
+    out = tmp_path / "out"
+    assert main(["format", CLS, str(data), "-o", str(out), "-j", jobs]) == 1
+    printed = capsys.readouterr().out
+    assert "FAIL" in printed and "6 processed" in printed
+    assert "1 failed" in printed
+    assert len(list(out.rglob("*.xml"))) == 5
+
+
+def test_generate(tmp_path: Path):
+    assert main(["xsd", CLS, "-o", str(tmp_path)]) == 0
+    assert main(["template", CLS, "-o", str(tmp_path)]) == 0
+    assert (tmp_path / "Record.xsd").exists()
+    assert (tmp_path / "Record_template.xml").exists()
+    assert main(["validate", "no_such_module.Record", str(tmp_path)]) == 2
@@ -1,8 +1,16 @@
+from array import array
 from dataclasses import dataclass
+from typing import Annotated
+from typing import Any
+from lxml import objectify
+from lxml.etree import Element, _Element
 import pytest
 
 from xmlable import *
-from xmlable._errors import XError
+from xmlable._errors import XError, XErrorCtx, ErrorTypes
+from xmlable._xobject import XObject
+from xmlable._manual import manual_xmlify
+from xmlable._lxml_helpers import with_text, XMLSchema
 
 
 def test_xmlified():
@@ -39,3 +47,212 @@ def test_reserved_attrs():
         @dataclass
         class A:
             xsd_forward: int
+
+
+def test_invalid_binary():
+    @xmlify
+    @dataclass
+    class A:
+        mem: list[str]
+
+    @xmlify
+    @dataclass
+    class B:
+        mem: list[int]
+
+    data = A(["a", "b"]).to_binary()
+    with pytest.raises(XError):
+        B.from_binary(data)
+    with pytest.raises(XError):
+        A.from_binary(data[:-1])
+    with pytest.raises(XError):
+        A.from_binary(data + b"\x00")
+
+
+def test_invalid_binary_fallback():
+    # a custom xobject, encoded as embedded xml
+    @manual_xmlify
+    @dataclass
+    class Host:
+        name: str
+
+        @staticmethod
+        def get_xobject() -> XObject:
+            class HostObj(XObject):
+                def xsd_out(self, name: str, attribs=None, add_ns=None):
+                    return Element(f"{XMLSchema}element", name=name)
+
+                def xml_temp(self, name: str) -> _Element:
+                    return Element(name)
+
+                def xml_out(self, name: str, val: Any, ctx: XErrorCtx):
+                    return with_text(Element(name), val.name)
+
+                def xml_in(self, obj, ctx: XErrorCtx) -> Any:
+                    return Host(str(obj.text))
+
+            return HostObj()
+
+        @staticmethod
+        def xsd_forward(add_ns: dict[str, str]) -> _Element:
+            return Element(f"{XMLSchema}simpleType", name="Host")
+
+        @staticmethod
+        def xsd_dependencies() -> set[type]:
+            return {Host}
+
+    data = Host("example.org").to_binary()
+    assert Host.from_binary(data) == Host("example.org")
+    assert data.endswith(b">")
+    with pytest.raises(XError):
+        Host.from_binary(data[:-1] + b"!")
+    with pytest.raises(XError):
+        Host.from_binary(data[:-1])
+
+
+def test_invalid_plain():
+    @xmlify
+    @dataclass
+    class A:
+        mem: dict[str, int]
+        opt: int | str | None
+
+    assert A.from_plain({"mem": {"a": 1}, "opt": None}) == A({"a": 1}, None)
+    assert A.from_plain({"mem": {}, "opt": {"Int": 3}}) == A({}, 3)
+    for invalid in [
+        {"mem": {"a": 1}},
+        {"mem": [["a", 1]], "opt": None},
+        {"mem": {"a": "1"}, "opt": None},
+        {"mem": {}, "opt": {"NoneType": None}},
+        {"mem": {}, "opt": {"Float": 3.0}},
+        {"mem": {}, "opt": 3},
+    ]:
+        with pytest.raises(XError):
+            A.from_plain(invalid)
+
+
+def test_dependency_cycle():
+    @xmlify
+    @dataclass
+    class A:
+        mem: int
+
+    @xmlify
+    @dataclass
+    class B:
+        a: A
+
+    @xmlify
+    @dataclass
+    class C:
+        b: B
+        a: A
+
+    A.xsd_dependencies = lambda: {A, C}
+    for cls in [A, B, C]:
+        with pytest.raises(XError):
+            cls.xsd()
+
+
+def test_validate_collects_errors():
+    @xmlify
+    @dataclass
+    class A:
+        ids: list[int]
+        names: dict[int, str]
+        tags: set[str]
+
+        def __post_init__(self):
+            raise AssertionError("validating should not build values")
+
+    xml = objectify.fromstring(
+        "<A><Ids><Int>1</Int><Int>x</Int><Int>y</Int></Ids>"
+        "<Names>"
+        "<Item><Key>1</Key><Val>a</Val></Item>"
+        "<Item><Key>01</Key><Val>b</Val></Item>"
+        "</Names>"
+        "<Tags><Str>a</Str><Str>a</Str></Tags></A>"
+    )
+    # two invalid ints, a duplicate key and a duplicate set item
+    errors = A.validate(xml)
+    assert len(errors) == 4
+    assert all(isinstance(e, XError) for e in errors)
+
+    missing = A.validate(objectify.fromstring("<A><Ids/></A>"))
+    assert len(missing) == 2
+
+
+def test_lazy_errors():
+    rendered = []
+
+    class Value:
+        def __repr__(self) -> str:
+            rendered.append(self)
+            return "Value()"
+
+    ctx = XErrorCtx(["A"]).next("b").next("c")
+    assert ctx.trace == ["A", "b", "c"]
+
+    error = ErrorTypes.InvalidData(ctx, Value(), "int")
+    assert rendered == []
+    assert error.format() == "\n".join(
+        [
+            "Invalid Data",
+            "What:  Could not validate Value() as a valid int",
+            "Why:   Produced xml must be valid",
+            "Where: A > b > c",
+        ]
+    )
+    assert len(rendered) == 1
+
+
+def test_missing_member():
+    @xmlify
+    @dataclass
+    class A:
+        a: int
+        b: int = 3
+
+    assert A.parse(objectify.fromstring("<A><A>1</A></A>")) == A(1)
+    with pytest.raises(XError):
+        A.parse(objectify.fromstring("<A><B>1</B></A>"))
+    assert len(A.validate(objectify.fromstring("<A><B>1</B></A>"))) == 1
+
+
+def test_sparse_invalid():
+    @xmlify
+    @dataclass
+    class S:
+        x: float = 1.0
+        n: int = 0
+
+    # equal to the defaults, but of the wrong types
+    for sparse in [False, True]:
+        with pytest.raises(XError):
+            S(x=1, n=0).xml_value(sparse=sparse)  # type: ignore[arg-type]
+        with pytest.raises(XError):
+            S(x=1.0, n=False).xml_value(sparse=sparse)
+
+
+def test_invalid_arrays():
+    with pytest.raises(XError):
+
+        @xmlify
+        @dataclass
+        class Text:
+            a: Annotated[array, "u"]
+
+    @xmlify
+    @dataclass
+    class A:
+        a: Annotated[array, "b"]
+
+    for xml in ["<A><A>1 x 3</A></A>", "<A><A>1 128</A></A>"]:
+        with pytest.raises(XError):
+            A.parse(objectify.fromstring(xml))
+        assert len(A.validate(objectify.fromstring(xml))) == 1
+    for invalid in [array("i", [1]), [1, 2]]:
+        with pytest.raises(XError):
+            A(invalid).xml_value()  # type: ignore[arg-type]
+    with pytest.raises(XError):
+        A.from_plain({"a": [1.5]})
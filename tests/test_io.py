@@ -0,0 +1,566 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from dataclasses import dataclass, field
+from pathlib import Path
+import pytest
+
+from xmlable import *
+from xmlable._errors import XError
+from xmlable._compression import open_xml
+from xmlable._parser import objectify_events
+from xmlable._io import FileIdentity
+from lxml import etree, objectify
+
+
+@xmlify
+@dataclass
+class Session:
+    id: int
+    app_name: str
+    ports: list[int]
+
+
+@xmlify
+@dataclass
+class Inspect:
+    debug_logs: bool
+    metrics_url: str
+
+
+@xmlify
+@dataclass
+class App:
+    mainconf: Inspect
+    named_sessions: dict[str, Session]
+    extra_sessions: list[Session]
+    name: str = "app"
+
+
+@xmlify
+@dataclass
+class NumberPort:
+    port: int
+
+
+@xmlify
+@dataclass
+class NamedPort:
+    port: str
+
+
+@xmlify
+@dataclass
+class Listener:
+    bind: NumberPort | NamedPort
+
+
+@xmlify
+@dataclass
+class Inventory:
+    stock: dict[str, int]
+    sessions: list[Session]
+    tags: list[str] = field(default_factory=list)
+    total: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        self.total = sum(self.stock.values()) + len(self.sessions)
+
+
+class Other:
+    # the same name and members as Inspect, in another namespace
+    @xmlify
+    @dataclass
+    class Inspect:
+        debug_logs: bool
+        metrics_url: str
+
+
+APP = App(
+    mainconf=Inspect(debug_logs=True, metrics_url="http://metrics"),
+    named_sessions={
+        "sess_123": Session(id=123, app_name="one", ports=[1, 2]),
+        "sess_124": Session(id=124, app_name="two", ports=[]),
+    },
+    extra_sessions=[
+        Session(id=i, app_name=f"extra-{i}", ports=[i]) for i in range(5)
+    ],
+    name="myapp",
+)
+
+
+def write_app(tmp_path: Path) -> Path:
+    path = tmp_path / "app.xml"
+    write_xml_value(path, APP)
+    return path
+
+
+def test_parse_only(tmp_path: Path):
+    path = write_app(tmp_path)
+    assert parse_file(App, path) == APP
+
+    parsed = parse_file(App, path, only=["Mainconf", "named_sessions"])
+    assert parsed.mainconf == APP.mainconf
+    assert parsed.named_sessions == APP.named_sessions
+    assert parsed.extra_sessions is UNPARSED
+    assert parsed.name == "app"
+
+    with pytest.raises(XError):
+        parse_file(App, path, only=["NotAField"])
+
+
+def test_query_file(tmp_path: Path):
+    path = write_app(tmp_path)
+    assert query_file(App, path, ()) == APP
+    assert query_file(App, path, ("mainconf",)) == APP.mainconf
+    assert (
+        query_file(App, path, ("Mainconf", "metrics_url")) == "http://metrics"
+    )
+    for key, session in APP.named_sessions.items():
+        assert query_file(App, path, ("named_sessions", key)) == session
+        assert (
+            query_file(App, path, ("named_sessions", key, "id")) == session.id
+        )
+    assert (
+        query_file(App, path, ("named_sessions", "sess_123", "ports", 1)) == 2
+    )
+    for i, session in enumerate(APP.extra_sessions):
+        assert query_file(App, path, ("extra_sessions", i)) == session
+    assert query_file(App, path, ("name",)) == "myapp"
+
+    for missing in [
+        ("named_sessions", "sess_999"),
+        ("extra_sessions", 10),
+        ("named_sessions", "sess_124", "ports", 0),
+    ]:
+        with pytest.raises(XError):
+            query_file(App, path, missing)
+
+    for invalid in [("nope",), ("extra_sessions", "one"), ("name", 0)]:
+        with pytest.raises(XError):
+            query_file(App, path, invalid)
+
+
+def test_query_keys_across_buffers(tmp_path: Path):
+    @xmlify
+    @dataclass
+    class Lookup:
+        d: dict[int, str]
+
+    lookup = Lookup({i * 7919: f"v{i * 7919}" for i in range(3000)})
+    path = tmp_path / "lookup.xml"
+    write_xml_value(path, lookup)
+
+    # items whose key is incomplete when the item starts (at the parser's
+    # buffer boundaries)
+    split = []
+    with open(path, "rb") as f:
+        for event, elem in objectify_events(f):
+            if event == "start" and elem.tag == "Item":
+                key = elem.find("Key")
+                split.append(None if key is None else key.text)
+            elif event == "end" and elem.tag == "Item":
+                started = split.pop()
+                if started != elem.Key.text:
+                    split.append(int(elem.Key.text))
+    assert split != [], "no keys split by the parser's buffers"
+
+    for key in split + [0, 2999 * 7919]:
+        assert query_file(Lookup, path, ("d", key)) == lookup.d[key]
+
+
+def test_config_cache(tmp_path: Path):
+    path = write_app(tmp_path)
+    other = tmp_path / "other.xml"
+    write_xml_value(other, APP.mainconf)
+
+    for cache in [
+        ConfigCache(maxsize=1),
+        ConfigCache(hash_contents=True),
+        ConfigCache(incremental=True),
+    ]:
+        first = cache.get(App, path)
+        assert first == APP
+        assert cache.get(App, path) is first
+        assert cache.poll() == []
+
+        changed = App(APP.mainconf, {}, [], "changed")
+        write_xml_value(path, changed)
+        assert cache.poll() == [(path.resolve(), changed)]
+        assert cache.get(App, path) == changed
+
+        write_xml_value(path, APP)
+        assert cache.get(App, path) == APP
+
+        assert cache.get(Inspect, other) == APP.mainconf
+        assert len(cache) == min(cache.maxsize, 2)
+        cache.invalidate()
+        assert len(cache) == 0
+
+
+def test_config_cache_touched(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    path = write_app(tmp_path)
+    cache = ConfigCache(hash_contents=True)
+    first = cache.get(App, path)
+
+    hashed = []
+    of = FileIdentity.of
+
+    def counted(file_path: Path, hash_contents: bool = False):
+        hashed.append(hash_contents)
+        return of(file_path, hash_contents)
+
+    monkeypatch.setattr(FileIdentity, "of", staticmethod(counted))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    for _ in range(3):
+        assert cache.poll() == []
+    assert hashed.count(True) == 1, "touched file hashed on every poll"
+    assert cache.get(App, path) is first
+
+
+def test_incremental_parser(tmp_path: Path):
+    path = write_app(tmp_path)
+    parser = IncrementalParser(App)
+    first = parser.parse_file(path)
+    assert first == APP
+    assert parser.parse_file(path) is first
+
+    changed = App(
+        mainconf=APP.mainconf,
+        named_sessions={
+            **APP.named_sessions,
+            "sess_124": Session(id=124, app_name="changed", ports=[3]),
+        },
+        extra_sessions=APP.extra_sessions[::-1],
+        name=APP.name,
+    )
+    write_xml_value(path, changed)
+    second = parser.parse_file(path)
+    assert second == changed
+    assert second.mainconf is first.mainconf
+    assert second.named_sessions["sess_123"] is first.named_sessions["sess_123"]
+    assert (
+        second.named_sessions["sess_124"].ports
+        is not first.named_sessions["sess_124"].ports
+    )
+    for moved, original in zip(
+        second.extra_sessions, first.extra_sessions[::-1]
+    ):
+        assert moved is original
+
+    # a changed item does not share the parts of a previous item reused whole
+    aliased = App(
+        mainconf=APP.mainconf,
+        named_sessions={},
+        extra_sessions=[
+            Session(id=0, app_name="z", ports=[1, 2]),
+            Session(id=0, app_name="a", ports=[1, 2]),
+        ],
+        name=APP.name,
+    )
+    write_xml_value(
+        path,
+        App(
+            APP.mainconf,
+            {},
+            [Session(0, "a", [1, 2]), Session(0, "b", [3])],
+            APP.name,
+        ),
+    )
+    parser.parse_file(path)
+    write_xml_value(path, aliased)
+    third = parser.parse_file(path)
+    assert third == aliased
+    assert third.extra_sessions[0].ports is not third.extra_sessions[1].ports
+
+
+def test_incremental_union_variants(tmp_path: Path):
+    # the variants have the same member, with the same text
+    path = tmp_path / "listener.xml"
+    parser = IncrementalParser(Listener)
+    write_xml_value(path, Listener(NumberPort(5)))
+    assert parser.parse_file(path) == Listener(NumberPort(5))
+
+    write_xml_value(path, Listener(NamedPort("5")))
+    switched = parser.parse_file(path)
+    assert switched == parse_file(Listener, path) == Listener(NamedPort("5"))
+    assert isinstance(switched.bind.port, str)
+
+
+def test_parse_cache(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    path = write_app(tmp_path)
+    cache_dir = tmp_path / "cache"
+    assert parse_file(App, path, cache_dir=cache_dir) == APP
+    assert len(list(cache_dir.iterdir())) == 1
+
+    def no_parse(_):
+        raise AssertionError("should be read from the cache")
+
+    with monkeypatch.context() as m:
+        m.setattr(App, "parse", no_parse)
+        assert parse_file(App, path, cache_dir=cache_dir) == APP
+
+    changed = App(APP.mainconf, {}, [], "changed")
+    write_xml_value(path, changed)
+    assert parse_file(App, path, cache_dir=cache_dir) == changed
+    assert len(list(cache_dir.iterdir())) == 2
+
+    inspect = tmp_path / "inspect.xml"
+    write_xml_value(inspect, APP.mainconf)
+    assert parse_file(Inspect, inspect, cache_dir=cache_dir) == APP.mainconf
+    other = parse_file(Other.Inspect, inspect, cache_dir=cache_dir)
+    assert type(other) is Other.Inspect
+
+
+def test_parse_cache_threads(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    # threads missing the cache together write the same entry together
+    path = write_app(tmp_path)
+    cache_dir = tmp_path / "cache"
+    threads = 4
+    barrier = Barrier(threads, timeout=10)
+    written: list[str] = []
+    replace = os.replace
+
+    def replace_together(src, dst):
+        written.append(str(src))
+        barrier.wait()
+        replace(src, dst)
+
+    with monkeypatch.context() as m:
+        m.setattr(os, "replace", replace_together)
+        with ThreadPoolExecutor(threads) as pool:
+            vals = list(
+                pool.map(
+                    lambda _: parse_file(App, path, cache_dir=cache_dir),
+                    range(threads),
+                )
+            )
+
+    assert vals == [APP] * threads
+    assert len(set(written)) == threads
+    assert [p.suffix for p in cache_dir.iterdir()] == [".pickle"]
+    assert parse_file(App, path, cache_dir=cache_dir) == APP
+
+
+def test_canonical_xml(tmp_path: Path):
+    reordered = App(
+        mainconf=APP.mainconf,
+        named_sessions=dict(reversed(APP.named_sessions.items())),
+        extra_sessions=APP.extra_sessions,
+        name=APP.name,
+    )
+    assert canonical_xml(APP) == canonical_xml(reordered)
+    assert b"\n" not in canonical_xml(APP)
+
+    path = tmp_path / "app.xml"
+    write_xml_value(path, reordered, canonical=True)
+    assert path.read_bytes() == canonical_xml(APP)
+    assert parse_file(App, path) == APP
+
+
+@pytest.mark.parametrize("name", ["app.xml.gz", "app.xml.xz", "app.xml.bz2"])
+def test_compressed_files(tmp_path: Path, name: str):
+    path = tmp_path / name
+    write_xml_value(path, APP, pretty=False)
+    assert not path.read_bytes().startswith(b"<?xml")
+    assert parse_file(App, path) == APP
+    assert parse_file(App, path, only=["mainconf"]).mainconf == APP.mainconf
+    assert query_file(App, path, ("extra_sessions", 3)) == APP.extra_sessions[3]
+    assert IncrementalParser(App).parse_file(path) == APP
+    assert ConfigCache().get(App, path) == APP
+    assert parse_file(App, path, cache_dir=tmp_path / "cache") == APP
+
+    explicit = tmp_path / "app.data"
+    write_xml_value(explicit, APP, compression="gzip")
+    assert parse_file(App, explicit, compression="gzip") == APP
+    with pytest.raises(XError):
+        write_xml_value(explicit, APP, compression="rar")
+
+
+def test_xsd_modules(tmp_path: Path):
+    @xmlify
+    @dataclass
+    class Base:
+        ports: list[int]
+
+    @xmlify
+    @dataclass
+    class Mid:
+        base: Base
+        ports: list[int]
+
+    @xmlify
+    @dataclass
+    class Top:
+        mid: Mid
+        bases: dict[str, Base]
+
+    Base.__module__ = "lib.base"
+    Mid.__module__ = "lib.mid"
+
+    written = write_xsd_modules(tmp_path, Top)
+    assert sorted(p.name for p in written) == sorted(
+        ["lib.base.xsd", "lib.mid.xsd", f"{__name__}.xsd", "Top.xsd"]
+    )
+    top = Top(Mid(Base([1]), [2, 3]), {"a": Base([]), "b": Base([4])})
+    schema = etree.XMLSchema(etree.parse(str(tmp_path / "Top.xsd")))
+    schema.assertValid(top.xml_value())
+
+    assert write_xsd_modules(tmp_path, Top) == []
+    (tmp_path / "lib.mid.xsd").unlink()
+    assert write_xsd_modules(tmp_path, Top) == [tmp_path / "lib.mid.xsd"]
+
+    # module files no longer used by the root are removed, unless another
+    # schema includes them
+    @xmlify
+    @dataclass
+    class Flat:
+        bases: dict[str, Base]
+
+    (tmp_path / "notes.xsd").write_text("<notes/>")
+    write_xsd_modules(tmp_path, Mid, id="MidRoot")
+    write_xsd_modules(tmp_path, Flat, id="Top")
+    assert (tmp_path / "lib.mid.xsd").exists()
+
+    (tmp_path / "MidRoot.xsd").unlink()
+    write_xsd_modules(tmp_path, Top)
+    write_xsd_modules(tmp_path, Flat, id="Top")
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        ["lib.base.xsd", f"{__name__}.xsd", "Top.xsd", "notes.xsd"]
+    )
+    schema = etree.XMLSchema(etree.parse(str(tmp_path / "Top.xsd")))
+    schema.assertValid(Flat({"a": Base([1])}).xml_value("Top"))
+
+
+def test_xml_values(tmp_path: Path):
+    sessions = APP.extra_sessions + list(APP.named_sessions.values())
+    tree = Session.xml_values(sessions, root="Sessions")
+    parsed = objectify.fromstring(etree.tostring(tree))
+    assert parsed.tag == "Sessions"
+    assert [Session.parse(s) for s in parsed.getchildren()] == sessions
+
+    for name, pretty in [("sessions.xml", True), ("sessions.xml.gz", False)]:
+        path = tmp_path / name
+        write_xml_values(
+            path, Session, iter(sessions), root="Sessions", pretty=pretty
+        )
+        with open_xml(path, "rb") as f:
+            streamed = f.read()
+        assert (b"\n  <Session>" in streamed) == pretty
+        parsed = objectify.fromstring(streamed)
+        assert [Session.parse(s) for s in parsed.getchildren()] == sessions
+
+
+def test_parse_file_parallel(tmp_path: Path):
+    path = write_app(tmp_path)
+    assert parse_file_parallel(App, path) == APP
+    assert parse_file_parallel(App, path, workers=2, chunk_size=1) == APP
+    assert parse_file_parallel(App, path, workers=3, chunk_size=2) == APP
+    with using_options(max_depth=3):
+        with pytest.raises(XError):
+            parse_file_parallel(App, path, workers=2, chunk_size=1)
+
+    invalid = App(
+        APP.mainconf,
+        APP.named_sessions,
+        APP.extra_sessions[:3]
+        + [Session(id=-1, app_name="bad", ports=[])]
+        + APP.extra_sessions[3:],
+        APP.name,
+    )
+    write_xml_value(path, invalid)
+    path.write_text(path.read_text().replace("<Id>-1</Id>", "<Id>bad</Id>"))
+    with pytest.raises(XError) as e:
+        parse_file_parallel(App, path, workers=2, chunk_size=2)
+    assert "Session[3]" in e.value.ctx.trace
+
+
+def test_parse_file_parallel_construct(tmp_path: Path):
+    # constructed once from all members, init=False members are left to the
+    # class
+    path = tmp_path / "inventory.xml"
+    inventory = Inventory(
+        stock={f"item-{i}": i for i in range(7)},
+        sessions=APP.extra_sessions,
+    )
+    write_xml_value(path, inventory, sparse=True)
+    assert "<Tags" not in path.read_text()
+    assert "<Total>26</Total>" in path.read_text()
+
+    path.write_text(path.read_text().replace("<Total>26", "<Total>0"))
+    parsed = parse_file_parallel(Inventory, path, workers=2, chunk_size=3)
+    assert parsed == parse_file(Inventory, path) == inventory
+    assert parsed.total == 26
+
+    path.write_text(
+        re.sub("<Sessions>.*</Sessions>", "", path.read_text(), flags=re.S)
+    )
+    with pytest.raises(XError):
+        parse_file_parallel(Inventory, path, workers=2, chunk_size=3)
+
+
+def test_validate_file(tmp_path: Path):
+    path = write_app(tmp_path)
+    assert validate_file(App, path) == []
+
+    path.write_text(
+        path.read_text()
+        .replace("<Id>123</Id>", "<Id>one</Id>")
+        .replace("<Id>124</Id>", "<Id>two</Id>")
+    )
+    assert len(validate_file(App, path)) == 2
+
+    path.write_text("<App><Mainconf>")
+    [error] = validate_file(App, path)
+    assert isinstance(error, XError)
+
+
+@pytest.mark.parametrize("name", ["app.xml.gz", "app.xml.xz", "app.xml.bz2"])
+def test_validate_corrupt_file(tmp_path: Path, name: str):
+    path = tmp_path / name
+    write_xml_value(path, APP)
+    data = bytearray(path.read_bytes())
+    for i in range(20, len(data) - 20):
+        data[i] ^= 0x55
+    path.write_bytes(bytes(data))
+    [error] = validate_file(App, path)
+    assert isinstance(error, XError)
+
+
+def test_hardened_parsing(tmp_path: Path):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("secret")
+    path = tmp_path / "inspect.xml"
+    path.write_text(
+        '<?xml version="1.0"?>\n'
+        '<!DOCTYPE Inspect [<!ENTITY host "metrics">]>\n'
+        "<Inspect><!-- note --><DebugLogs>true</DebugLogs>"
+        "<MetricsUrl>http://&host;/</MetricsUrl></Inspect>"
+    )
+    assert parse_file(Inspect, path) == Inspect(True, "http://metrics/")
+
+    path.write_text(
+        '<?xml version="1.0"?>\n'
+        f'<!DOCTYPE Inspect [<!ENTITY xxe SYSTEM "file://{secret}">]>\n'
+        "<Inspect><DebugLogs>true</DebugLogs>"
+        "<MetricsUrl>url&xxe;</MetricsUrl></Inspect>"
+    )
+    with pytest.raises(etree.XMLSyntaxError):
+        parse_file(Inspect, path)
+    with using_options(max_depth=8):
+        with pytest.raises(etree.XMLSyntaxError):
+            parse_file(Inspect, path)
+    assert len(validate_file(Inspect, path)) == 1
+
+    path = write_app(tmp_path)
+    for limits in [{"max_depth": 3}, {"max_elements": 20}, {"max_text": 5}]:
+        with using_options(**limits):
+            with pytest.raises(XError):
+                parse_file(App, path)
+            with pytest.raises(XError):
+                query_file(App, path, ("name",))
+            assert len(validate_file(App, path)) == 1
+    with using_options(max_depth=6, max_elements=1000, max_text=100):
+        assert parse_file(App, path) == APP
@@ -0,0 +1,69 @@
+from dataclasses import dataclass
+from pathlib import Path
+from lxml import etree, objectify
+
+from xmlable import *
+
+
+@xmlify
+@dataclass
+class Point:
+    x: int
+    y: float
+
+
+@xmlify
+@dataclass
+class Shape:
+    name: str
+    points: list[Point]
+    tags: set[str]
+    props: dict[str, int | str | None]
+
+
+SHAPES = [
+    Shape(
+        name=f"shape-{i}",
+        points=[Point(x=j, y=j / 2) for j in range(i % 7)],
+        tags={f"tag-{j}" for j in range(i % 5)},
+        props={f"prop-{j}": j if j % 3 else None for j in range(i % 4)},
+    )
+    for i in range(50)
+]
+
+
+def generate(shape: Shape, canonical: bool) -> tuple[bytes, bytes, Shape]:
+    xsd = etree.tostring(Shape.xsd(namespaces={}))
+    xml = etree.tostring(shape.xml_value(canonical=canonical))
+    return xsd, xml, Shape.parse(objectify.fromstring(xml))
+
+
+def test_concurrent_generation():
+    expected = [generate(shape, i % 2 == 0) for i, shape in enumerate(SHAPES)]
+    for _ in range(5):
+        results = run_concurrently(
+            [
+                lambda s=shape, c=(i % 2 == 0): generate(s, c)
+                for i, shape in enumerate(SHAPES)
+            ],
+            workers=8,
+        )
+        assert results == expected
+
+
+def test_concurrent_io(tmp_path: Path):
+    paths = [tmp_path / f"shape-{i}.xml" for i in range(len(SHAPES))]
+    run_concurrently(
+        [lambda p=p, s=s: write_xml_value(p, s) for p, s in zip(paths, SHAPES)],
+        workers=8,
+    )
+    cache = ConfigCache(incremental=True)
+    for _ in range(3):
+        parsed = run_concurrently(
+            [lambda p=p: cache.get(Shape, p) for p in paths * 2], workers=8
+        )
+        assert parsed == SHAPES * 2
+    assert run_concurrently(
+        [lambda p=p: canonical_xml(parse_file(Shape, p)) for p in paths],
+        workers=8,
+    ) == [canonical_xml(s) for s in SHAPES]